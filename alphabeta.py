@@ -0,0 +1,74 @@
+"""
+Alpha-beta pruning minimax, written as negamax: every score is from the
+point of view of the player to move, and a child's score is negated to get
+its parent's.
+"""
+from typing import Any
+
+# Scores lie in [LOSE, WIN], so these act as minus and plus infinity.
+NEG_INF = -2
+POS_INF = 2
+
+
+def alphabeta_outcome(state: Any, alpha: int = NEG_INF, beta: int = POS_INF,
+                      orderer: Any = None, ply: int = 0) -> int:
+    """
+    Return the minimax score of state for its current player, searching with
+    the window (alpha, beta). state is ply plies below the root of the
+    search. If orderer, a MoveOrderer, is given it decides the order moves
+    are tried in and is told about cutoffs and best moves.
+
+    The result is fail-soft: if the true score is at most alpha the result
+    is an upper bound on it that is at most alpha, and if the true score is
+    at least beta the result is a lower bound on it that is at least beta.
+    A child that wins outright stops the search of its siblings, since
+    nothing can score better than a win.
+
+    state is left as it was, though it may be changed and restored along
+    the way.
+
+    >>> from subtract_square_state import SubtractSquareState
+    >>> alphabeta_outcome(SubtractSquareState(True, 18))
+    1
+    >>> alphabeta_outcome(SubtractSquareState(True, 2))
+    -1
+    """
+    decided = state.decided_outcome()
+    if decided is not None:
+        return decided
+    moves = state.search_moves()
+    if moves == []:
+        return state.LOSE
+    if orderer is not None:
+        moves = orderer.order(state, moves, ply)
+    best_outcome = NEG_INF
+    best_move = None
+    for move in moves:
+        if state.supports_apply:
+            state.apply(move)
+            score = -alphabeta_outcome(state, -beta,
+                                       -max(alpha, best_outcome),
+                                       orderer, ply + 1)
+            state.undo()
+        else:
+            score = -alphabeta_outcome(state.make_move(move), -beta,
+                                       -max(alpha, best_outcome),
+                                       orderer, ply + 1)
+        if score > best_outcome:
+            best_outcome = score
+            best_move = move
+            if best_outcome >= beta or best_outcome == state.WIN:
+                if orderer is not None:
+                    # The number of moves left stands in for the depth
+                    # left, which an exhaustive search does not track.
+                    orderer.record_cutoff(move, ply, len(moves))
+                break
+    if orderer is not None:
+        orderer.record_best(state, best_move, best_outcome)
+    return best_outcome
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
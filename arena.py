@@ -0,0 +1,282 @@
+"""
+A preallocated arena that holds every position of a Stonehedge search in
+one array, one slot per ply, and a strategy that searches on the slots
+instead of on StonehedgeState objects.
+"""
+from array import array
+from typing import Any
+from stonehedge import StonehedgeState, LETTERS, get_topology
+from strategy import minimax_alphabeta
+
+# Where each field sits in a slot. The claim counts come last: p1's count on
+# each leyline, then p2's. Counts stop changing once a leyline is captured.
+P1_CELLS = 0
+P2_CELLS = 1
+P1_LEYLINES = 2
+P2_LEYLINES = 3
+P1_CAPTURED = 4
+P2_CAPTURED = 5
+P1_TURN = 6
+# The cells on at least one uncaptured leyline, as a mask.
+LIVE = 7
+# The uncaptured leylines that one more claim by p1, or by p2, would
+# capture, as masks.
+P1_HOT = 8
+P2_HOT = 9
+# The cells still to try from the position, as a mask.
+MOVES = 10
+COUNTS = 11
+
+WIN = StonehedgeState.WIN
+LOSE = StonehedgeState.LOSE
+
+
+class StateArena:
+    """
+    The positions on the path of a search of a Stonehedge board, kept in one
+    array of ints that is made once and reused. Slot i holds the position i
+    plies below the root. A move is made by copying a slot into the next one
+    and changing it there, so going back up the path needs no undo and a
+    search makes no state objects at all.
+
+    board_size - the side length of the board this arena is for
+    width - the number of ints in each slot
+    slots - the slots, one after the other
+    """
+    board_size: int
+    width: int
+    slots: array
+
+    def __init__(self, board_size: int) -> None:
+        """
+        Initialize an arena deep enough for a whole game on a board of
+        board_size.
+        """
+        self.board_size = board_size
+        self._topology = get_topology(board_size)
+        self.width = COUNTS + 2 * self._topology.num_leylines
+        # The mask of the leylines through each cell.
+        self._cell_masks = tuple(sum(1 << i for i in leylines) for leylines
+                                 in self._topology.cell_leylines)
+        self.slots = array('q', [0]) * (self.width
+                                        * (self._topology.num_cells + 1))
+        self._view = memoryview(self.slots)
+
+    def load(self, state: StonehedgeState, ply: int = 0) -> None:
+        """
+        Write state into slot ply.
+
+        Precondition: state.size == self.board_size
+        """
+        base = ply * self.width
+        slots = self.slots
+        slots[base + P1_CELLS] = state._p1_cells
+        slots[base + P2_CELLS] = state._p2_cells
+        slots[base + P1_LEYLINES] = state._p1_leylines
+        slots[base + P2_LEYLINES] = state._p2_leylines
+        slots[base + P1_CAPTURED] = state._p1_captured
+        slots[base + P2_CAPTURED] = state._p2_captured
+        slots[base + P1_TURN] = state.p1_turn
+        slots[base + LIVE] = state._live_cells()
+        slots[base + MOVES] = 0
+        for i, count in enumerate(state._counts):
+            slots[base + COUNTS + i] = count
+        captured = state._p1_leylines | state._p2_leylines
+        num_leylines = self._topology.num_leylines
+        for hot, offset in ((P1_HOT, 0), (P2_HOT, num_leylines)):
+            slots[base + hot] = sum(
+                1 << i for i, threshold in enumerate(self._topology.thresholds)
+                if not captured >> i & 1
+                and state._counts[offset + i] + 1 >= threshold)
+
+    def state(self, ply: int = 0) -> StonehedgeState:
+        """
+        Return the position in slot ply as a StonehedgeState.
+
+        >>> arena = StateArena(2)
+        >>> arena.load(StonehedgeState(True, 2).make_move("D"))
+        >>> arena.claim(0, 0)
+        >>> arena.state(1) == StonehedgeState(True, 2).make_move(
+        ...     "D").make_move("A")
+        True
+        """
+        base = ply * self.width
+        slots = self.slots
+        cells = [1 if slots[base + P1_CELLS] >> i & 1
+                 else 2 if slots[base + P2_CELLS] >> i & 1 else LETTERS[i]
+                 for i in range(self._topology.num_cells)]
+        leylines = [1 if slots[base + P1_LEYLINES] >> i & 1
+                    else 2 if slots[base + P2_LEYLINES] >> i & 1 else "@"
+                    for i in range(self._topology.num_leylines)]
+        return StonehedgeState(bool(slots[base + P1_TURN]), self.board_size,
+                               leylines, cells)
+
+    def claim(self, ply: int, cell: int) -> None:
+        """
+        Write into slot ply + 1 the position after the player to move in
+        slot ply claims cell.
+        """
+        topology = self._topology
+        slots = self.slots
+        width = self.width
+        base = ply * width + width
+        self._view[base:base + width] = self._view[base - width:base]
+        if slots[base + P1_TURN]:
+            leylines, total, hot, other_hot, counts = (
+                P1_LEYLINES, P1_CAPTURED, P1_HOT, P2_HOT, base + COUNTS)
+            slots[base + P1_CELLS] |= 1 << cell
+        else:
+            leylines, total, hot, other_hot, counts = (
+                P2_LEYLINES, P2_CAPTURED, P2_HOT, P1_HOT,
+                base + COUNTS + topology.num_leylines)
+            slots[base + P2_CELLS] |= 1 << cell
+        slots[base + P1_TURN] ^= 1
+        captured = slots[base + P1_LEYLINES] | slots[base + P2_LEYLINES]
+        hot_mask = slots[base + hot]
+        new = 0
+        for i in topology.cell_leylines[cell]:
+            if not captured >> i & 1:
+                count = slots[counts + i] + 1
+                slots[counts + i] = count
+                if count >= topology.thresholds[i]:
+                    new |= 1 << i
+                elif count + 1 >= topology.thresholds[i]:
+                    hot_mask |= 1 << i
+        if new:
+            slots[base + hot] = hot_mask & ~new
+            slots[base + other_hot] &= ~new
+            slots[base + leylines] |= new
+            slots[base + total] += new.bit_count()
+            # A cell stays live while any leyline through it is open.
+            captured |= new
+            live = slots[base + LIVE]
+            cell_masks = self._cell_masks
+            for i in topology.cell_leylines[cell]:
+                if new >> i & 1:
+                    for other in topology.leyline_cells[i]:
+                        if not cell_masks[other] & ~captured:
+                            live &= ~(1 << other)
+            slots[base + LIVE] = live
+        else:
+            slots[base + hot] = hot_mask
+
+    def _enter(self, ply: int) -> Any:
+        """
+        Return the score of slot ply for its player to move if it is settled
+        without searching, as StonehedgeState.decided_outcome() would.
+        Otherwise set the slot's MOVES to the cells to try, as
+        StonehedgeState.search_moves() would, and return None.
+        """
+        topology = self._topology
+        slots = self.slots
+        base = ply * self.width
+        to_win = topology.to_win
+        if slots[base + P1_TURN]:
+            mine, theirs, hot = (slots[base + P1_CAPTURED],
+                                 slots[base + P2_CAPTURED],
+                                 slots[base + P1_HOT])
+        else:
+            mine, theirs, hot = (slots[base + P2_CAPTURED],
+                                 slots[base + P1_CAPTURED],
+                                 slots[base + P2_HOT])
+        if mine >= to_win or theirs >= to_win:
+            return LOSE
+        empty = ~(slots[base + P1_CELLS] | slots[base + P2_CELLS]) & (
+            (1 << topology.num_cells) - 1)
+        live = slots[base + LIVE]
+        needed = to_win - mine
+        if hot.bit_count() >= needed:
+            cell_masks = self._cell_masks
+            cells = empty & live
+            while cells:
+                cell = (cells & -cells).bit_length() - 1
+                cells &= cells - 1
+                if (hot & cell_masks[cell]).bit_count() >= needed:
+                    return WIN
+        dead = empty & ~live
+        moves = empty & live | dead & -dead
+        if moves == 0:
+            return LOSE
+        slots[base + MOVES] = moves
+        return None
+
+    def outcome(self, ply: int = 0) -> int:
+        """
+        Return the minimax score of slot ply for its player to move.
+
+        The search walks down and back up the slots below ply, keeping in
+        each one the cells it has not tried yet, and stops trying cells from
+        a position once one of them wins.
+
+        >>> arena = StateArena(2)
+        >>> arena.load(StonehedgeState(True, 2))
+        >>> arena.outcome()
+        1
+        """
+        slots = self.slots
+        width = self.width
+        top = ply
+        score = self._enter(top)
+        while True:
+            if score is None:
+                moves = slots[top * width + MOVES]
+                if moves:
+                    bit = moves & -moves
+                    slots[top * width + MOVES] = moves ^ bit
+                    self.claim(top, bit.bit_length() - 1)
+                    top += 1
+                    score = self._enter(top)
+                    continue
+                # Every cell tried leaves the opponent a win.
+                score = LOSE
+            if top == ply:
+                return score
+            top -= 1
+            score = WIN if score == LOSE else None
+
+
+class ArenaSearch:
+    """
+    A strategy that plays Stonehedge by searching on a StateArena, and
+    falls back on minimax_alphabeta for any other game. It picks the same
+    move as minimax_alphabeta. Only the position the strategy is given is a
+    StonehedgeState; every position below it lives in the arena.
+
+    arenas - the arena for each board size played so far
+    """
+    arenas: dict
+
+    def __init__(self) -> None:
+        """
+        Initialize this strategy with no arenas made yet.
+        """
+        self.arenas = {}
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return the first move for game with the best score.
+        """
+        state = game.current_state
+        if not isinstance(state, StonehedgeState):
+            return minimax_alphabeta(game)
+        if state.size not in self.arenas:
+            self.arenas[state.size] = StateArena(state.size)
+        arena = self.arenas[state.size]
+        arena.load(state)
+        best_move = None
+        best_outcome = LOSE - 1
+        for move in state.distinct_moves():
+            arena.claim(0, LETTERS.index(move))
+            score = -arena.outcome(1)
+            if score > best_outcome:
+                best_outcome = score
+                best_move = move
+                if best_outcome == WIN:
+                    break
+        return best_move
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
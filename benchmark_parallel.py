@@ -0,0 +1,82 @@
+"""
+Benchmark the Young Brothers Wait search against serial alpha-beta on the
+positions from minimax_unittest_basic.py, plus an empty size 3 Stonehenge
+board to give the workers something substantial to share.
+
+Usage: python benchmark_parallel.py [worker count ...]
+"""
+import sys
+import time
+from typing import Any
+from parallel import YoungBrothersWait
+from stonehedge import StonehedgeState
+from strategy import minimax_alphabeta
+from subtract_square_state import SubtractSquareState
+
+
+class BenchmarkGame:
+    """
+    A stand-in for a Game that only holds the state to search from.
+    """
+
+    def __init__(self, current_state: Any) -> None:
+        self.current_state = current_state
+
+
+def stonehedge_position(size: int, moves: str) -> StonehedgeState:
+    """
+    Return the Stonehedge state of side length size after moves, with p1
+    moving first.
+    """
+    state = StonehedgeState(True, size)
+    for move in moves:
+        state = state.make_move(move)
+    return state
+
+
+POSITIONS = [("SubtractSquare 4", SubtractSquareState(True, 4)),
+             ("SubtractSquare 18", SubtractSquareState(True, 18)),
+             ("Stonehenge 2 AFD", stonehedge_position(2, "AFD")),
+             ("Stonehenge 3 ACBFEGDI", stonehedge_position(3, "ACBFEGDI")),
+             ("Stonehenge 3 empty", stonehedge_position(3, ""))]
+
+
+def time_strategy(strategy: Any, state: Any, repeats: int = 3) -> float:
+    """
+    Return the fastest of repeats timings of strategy choosing a move from
+    state, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        strategy(BenchmarkGame(state))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(worker_counts: list) -> None:
+    """
+    Print the serial time and the speedup for each worker count on every
+    benchmark position.
+    """
+    strategies = {}
+    for workers in worker_counts:
+        strategies[workers] = YoungBrothersWait(workers)
+        # Start the pool before timing anything.
+        strategies[workers](BenchmarkGame(SubtractSquareState(True, 4)))
+    print("{:<24}{:>10}".format("position", "serial") + "".join(
+        "{:>10}".format("{} wkr".format(workers))
+        for workers in worker_counts))
+    for name, state in POSITIONS:
+        serial = time_strategy(minimax_alphabeta, state)
+        row = "{:<24}{:>9.3f}s".format(name, serial)
+        for workers in worker_counts:
+            elapsed = time_strategy(strategies[workers], state)
+            row += "{:>9.2f}x".format(serial / elapsed)
+        print(row)
+    for strategy in strategies.values():
+        strategy.close()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 2, 4, 8])
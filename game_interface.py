@@ -11,18 +11,40 @@ your own curiousity!)
 
 from strategy import *
 from typing import Any, Callable
-from subtract_square_game import SubtractSquareGame
+from iterative_deepening import IterativeDeepening
+from parallel import ParallelMinimax, YoungBrothersWait
+from mcts import MonteCarloTreeSearch, RootParallelMCTS
+from proof_number import ProofNumberSearch
+from tablebase import TablebaseStrategy
+from square_table import SquareTableStrategy
+from grundy import SpragueGrundyStrategy
+from arena import ArenaSearch
+from subtract_square_game import SubtractSquareGame, MultiSubtractSquareGame
 from stonehedge import StonehedgeGame
 
 # 'h' should map to Stonehenge.
 playable_games = {'s': SubtractSquareGame,
-                  'h': StonehedgeGame}
+                  'h': StonehedgeGame,
+                  'm': MultiSubtractSquareGame}
 
 # 'mr' should map to your recursive implementation of minimax while
 # 'mi' should map to your iterative implementation of minimax
 usable_strategies = {'i': interactive_strategy,
                      'mr': minimax_recursive,
-                     'mi': minimax_iterative}
+                     'mi': minimax_iterative,
+                     'mt': minimax_memoized,
+                     'ab': minimax_alphabeta,
+                     'id': IterativeDeepening(time_budget=1.0),
+                     'pm': ParallelMinimax(),
+                     'yb': YoungBrothersWait(),
+                     'mc': MonteCarloTreeSearch(milliseconds=1000),
+                     'mp': RootParallelMCTS(milliseconds=1000),
+                     'pn': ProofNumberSearch(max_nodes=100000,
+                                             max_entries=200000),
+                     'tb': TablebaseStrategy(),
+                     'sq': SquareTableStrategy(),
+                     'sg': SpragueGrundyStrategy(),
+                     'ar': ArenaSearch()}
 
 
 class GameInterface:
@@ -104,8 +126,11 @@ if __name__ == '__main__':
                        playable_games[key] is not None else
                        "'{}': None".format(key) for key in playable_games])
 
-    strategies = ", ".join(["'{}': {}".format(key,
-                                              usable_strategies[key].__name__)
+    # Configurable strategies are callable objects rather than functions,
+    # so fall back to their class name.
+    strategies = ", ".join(["'{}': {}".format(
+        key, getattr(usable_strategies[key], '__name__',
+                     type(usable_strategies[key]).__name__))
                             if usable_strategies[key] is not None else
                             "'{}': None".format(key)
                             for key in usable_strategies])
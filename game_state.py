@@ -14,11 +14,28 @@ class GameState:
     LOSE - score if player is in a losing position
     DRAW - score if player is in a tied position
     p1_turn - whether it is p1's turn or not
+    supports_apply - whether this state implements apply() and undo(), so
+                     that a search can walk the game tree on one state
+                     instead of calling make_move()
+    legal_moves - the moves of get_possible_moves() as a tuple
+    is_terminal - whether there are no legal moves, so the game is over
+    winner - 'p1' or 'p2' if the game is over, since the player left to
+             move has lost, and None otherwise
+
+    The last three are worked out the first time they are asked for and
+    then kept. A state that changes in place through apply() or undo()
+    clears them by setting _legal_moves back to None.
+
+    Every state class lists its attributes in __slots__, so a state has no
+    __dict__ and takes only the memory its attributes need. Subclasses
+    that add attributes list them in their own __slots__.
     """
+    __slots__ = ('p1_turn', '_legal_moves')
     WIN: int = 1
     LOSE: int = -1
     DRAW: int = 0
     p1_turn: bool
+    supports_apply: bool = False
 
     def __init__(self, is_p1_turn: bool) -> None:
         """
@@ -27,6 +44,34 @@ class GameState:
 
         """
         self.p1_turn = is_p1_turn
+        self._legal_moves = None
+
+    @property
+    def legal_moves(self) -> tuple:
+        """
+        Return the moves of get_possible_moves() as a tuple, working them
+        out only the first time they are asked for.
+        """
+        if self._legal_moves is None:
+            self._legal_moves = tuple(self.get_possible_moves())
+        return self._legal_moves
+
+    @property
+    def is_terminal(self) -> bool:
+        """
+        Return whether there are no legal moves from this state.
+        """
+        return self.legal_moves == ()
+
+    @property
+    def winner(self) -> Any:
+        """
+        Return the name of the player who won if the game is over at this
+        state, and None otherwise.
+        """
+        if not self.is_terminal:
+            return None
+        return 'p2' if self.p1_turn else 'p1'
 
     def __str__(self) -> str:
         """
@@ -55,6 +100,19 @@ class GameState:
         """
         raise NotImplementedError
 
+    def apply(self, move: Any) -> None:
+        """
+        Apply move to this GameState in place, remembering it so that undo()
+        can reverse it.
+        """
+        raise NotImplementedError
+
+    def undo(self) -> None:
+        """
+        Reverse the most recent apply() on this GameState.
+        """
+        raise NotImplementedError
+
     def is_valid_move(self, move: Any) -> bool:
         """
         Return whether move is a valid move for this GameState.
@@ -68,6 +126,54 @@ class GameState:
         """
         raise NotImplementedError
 
+    def move_priority(self, move: Any) -> int:
+        """
+        Return how promising move looks from this state without searching,
+        where larger is better. Searches use this to break ties when
+        ordering moves.
+        """
+        return 0
+
+    def key(self) -> Any:
+        """
+        Return a hashable value that identifies this state's position and
+        player to move, for use as a cache key. Unlike the state itself, the
+        key does not change if the state is later changed by apply().
+        """
+        return repr(self)
+
+    def canonical_key(self) -> Any:
+        """
+        Return a key() shared by every position that plays the same as this
+        one, such as its mirror images, for caches whose entries do not
+        depend on which of those positions they came from.
+        """
+        return self.key()
+
+    def search_moves(self) -> list:
+        """
+        Return the moves a search has to try from this state: the moves of
+        get_possible_moves(), leaving out any move that is known to lead to
+        a position playing the same as an earlier move's without needing to
+        look at the position itself.
+        """
+        return self.get_possible_moves()
+
+    def distinct_moves(self) -> list:
+        """
+        Return the moves of this state, leaving out any move that leads to
+        a position playing the same as an earlier move's.
+        """
+        return self.search_moves()
+
+    def decided_outcome(self) -> Any:
+        """
+        Return WIN or LOSE if the outcome for the player to move is already
+        certain however the game is played from here, and None if it is not
+        known to be.
+        """
+        return None
+
     def rough_outcome(self) -> float:
         """
         Return an estimate in interval [LOSE, WIN] of best outcome the current
@@ -0,0 +1,214 @@
+"""
+A solver for subtraction games that works out Grundy values one total at a
+time and, for finite subtraction sets, spots when they start repeating.
+"""
+from typing import Any
+from subtraction_state import SubtractionState
+from subtract_square_state import MultiSubtractSquareState, squares
+from strategy import minimax_alphabeta
+
+
+class GrundySolver:
+    """
+    The Grundy values of the totals of one subtraction game.
+
+    The Grundy value of a total is the smallest number that is not the
+    Grundy value of a total one move away; the player to move wins exactly
+    when it is not 0. With a finite subtraction set whose largest number is
+    m, the values are eventually periodic, and once a stretch of m values
+    repeats one period later, every value after it does too. From then on
+    the value of any total, however large, is read from one period.
+
+    subtraction_set - the subtraction set of the game, as kept by
+                      SubtractionState
+    values - the Grundy values of totals 0, 1, 2, ... worked out so far
+    preperiod - the first total from which the values repeat, or None if
+                that is not known yet
+    period - the length of the repeat, or None if that is not known yet
+    """
+    subtraction_set: Any
+    values: list
+    preperiod: Any
+    period: Any
+
+    def __init__(self, subtraction_set: Any) -> None:
+        """
+        Initialize a solver for the subtraction game with subtraction_set.
+
+        >>> solver = GrundySolver([1, 2])
+        >>> solver.grundy(10 ** 100 + 1), solver.preperiod, solver.period
+        (2, 0, 3)
+        """
+        state = SubtractionState(True, 0, subtraction_set)
+        self.subtraction_set = state.subtraction_set
+        self.values = []
+        self.preperiod = None
+        self.period = None
+
+    def grundy(self, total: int) -> int:
+        """
+        Return the Grundy value of total.
+
+        >>> GrundySolver([2, 5, 7]).grundy(12)
+        1
+        """
+        if total >= len(self.values) and self.period is not None:
+            return self.values[self.preperiod
+                               + (total - self.preperiod) % self.period]
+        while total >= len(self.values):
+            self._extend(max(64, 2 * len(self.values)))
+            if self.period is not None:
+                return self.grundy(total)
+        return self.values[total]
+
+    def outcome(self, state: SubtractionState) -> int:
+        """
+        Return state.WIN if the player to move in state can force a win, and
+        state.LOSE otherwise.
+
+        >>> GrundySolver([1, 2]).outcome(SubtractionState(True, 9, [1, 2]))
+        -1
+        """
+        if self.grundy(state.current_total) == 0:
+            return state.LOSE
+        return state.WIN
+
+    def best_move(self, state: SubtractionState) -> Any:
+        """
+        Return a move from state that leaves a total of Grundy value 0, or
+        the smallest move if there is none.
+
+        >>> GrundySolver([1, 2]).best_move(SubtractionState(True, 10, [1, 2]))
+        1
+        """
+        moves = state.get_possible_moves()
+        for move in moves:
+            if self.grundy(state.current_total - move) == 0:
+                return move
+        return moves[0] if moves else None
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return a move for game that wins if any move does.
+        """
+        return self.best_move(game.current_state)
+
+    def _extend(self, size: int) -> None:
+        """
+        Work out the Grundy values of every total below size, and look for
+        a period if the subtraction set is finite.
+        """
+        values = self.values
+        numbers = SubtractionState(True, size - 1,
+                                   self.subtraction_set).get_possible_moves()
+        for total in range(len(values), size):
+            seen = set()
+            for move in numbers:
+                if move > total:
+                    break
+                seen.add(values[total - move])
+            value = 0
+            while value in seen:
+                value += 1
+            values.append(value)
+        if not callable(self.subtraction_set) and self.subtraction_set:
+            self._find_period()
+
+    def _find_period(self) -> None:
+        """
+        Set preperiod and period to the shortest period, and the earliest
+        start for it, that the values so far prove.
+        """
+        values = self.values
+        window = self.subtraction_set[-1]
+        for period in range(1, (len(values) - window) // 2 + 1):
+            # Walk back from the end to the last total that breaks the
+            # repeat; everything after it repeats.
+            total = len(values) - 1
+            while total >= period and values[total] == values[total - period]:
+                total -= 1
+            if len(values) - 1 - total >= window:
+                self.preperiod = total - period + 1
+                self.period = period
+                return
+
+
+class SpragueGrundyStrategy:
+    """
+    A strategy for MultiSubtractSquareState that treats each total as its
+    own game of SubtractSquare. A sum of games is lost for the player to
+    move exactly when the nim-sum (the bitwise XOR) of the Grundy values of
+    its parts is 0, so a move only needs one Grundy value per total rather
+    than a search of every combination of totals.
+
+    A single-total subtraction game is played straight from the Grundy
+    values of its subtraction set, and any other game is left to
+    minimax_alphabeta.
+
+    solver - the Grundy values of SubtractSquare totals, shared by every
+             game this strategy plays
+    solvers - the Grundy values of every subtraction game played so far,
+              by subtraction set
+    """
+    solver: GrundySolver
+    solvers: dict
+
+    def __init__(self) -> None:
+        """
+        Initialize this strategy with no Grundy values worked out yet.
+        """
+        self.solver = GrundySolver(squares)
+        self.solvers = {self.solver.subtraction_set: self.solver}
+
+    def nim_sum(self, state: MultiSubtractSquareState) -> int:
+        """
+        Return the nim-sum of the Grundy values of the totals in state.
+
+        >>> SpragueGrundyStrategy().nim_sum(MultiSubtractSquareState(True,
+        ...                                                          [2, 3]))
+        1
+        """
+        result = 0
+        for total in state.totals:
+            result ^= self.solver.grundy(total)
+        return result
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return a move for game that leaves a nim-sum of 0, or the first move
+        if there is none.
+
+        >>> from subtract_square_game import MultiSubtractSquareGame
+        >>> game = MultiSubtractSquareGame.__new__(MultiSubtractSquareGame)
+        >>> game.current_state = MultiSubtractSquareState(True, [2, 3])
+        >>> SpragueGrundyStrategy()(game)
+        (1, 1)
+        """
+        state = game.current_state
+        if isinstance(state, SubtractionState):
+            if state.subtraction_set not in self.solvers:
+                self.solvers[state.subtraction_set] = GrundySolver(
+                    state.subtraction_set)
+            return self.solvers[state.subtraction_set].best_move(state)
+        if not isinstance(state, MultiSubtractSquareState):
+            return minimax_alphabeta(game)
+        target = self.nim_sum(state)
+        if target != 0:
+            for heap, total in enumerate(state.totals):
+                # Only a total whose value has the top bit of the nim-sum
+                # can be brought down to cancel it.
+                value = self.solver.grundy(total) ^ target
+                if value < self.solver.grundy(total):
+                    root = 1
+                    while root * root <= total:
+                        if self.solver.grundy(total - root * root) == value:
+                            return heap, root * root
+                        root += 1
+        moves = state.get_possible_moves()
+        return moves[0] if moves else None
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,152 @@
+"""
+Iterative deepening: alpha-beta searches to depth 1, 2, 3, ... with
+rough_outcome() scoring the positions at the depth limit, until the time
+budget for the move runs out.
+
+rough_outcome() is only a guess, so it is halved at the depth limit. Only a
+decided or finished position scores WIN or LOSE, and a search stops early
+on a win only once the win is proven.
+"""
+import time
+from typing import Any
+from alphabeta import NEG_INF
+from move_ordering import MoveOrderer
+from transposition import TranspositionTable
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its deadline has passed.
+    """
+    pass
+
+
+class IterativeDeepening:
+    """
+    A strategy that deepens an alpha-beta search one ply at a time and
+    answers with the best move of the deepest search that finished within
+    time_budget seconds. Each search tries the previous search's best move
+    first, and below the root moves are tried in the order orderer gives.
+
+    time_budget - the number of seconds to spend choosing a move
+    max_depth - the deepest search to run, or None for no limit
+    orderer - the MoveOrderer used below the root
+    depth_reached - the depth of the last search that finished
+    """
+    time_budget: float
+    max_depth: Any
+    orderer: MoveOrderer
+    depth_reached: int
+
+    def __init__(self, time_budget: float = 1.0, max_depth: int = None,
+                 orderer: MoveOrderer = None) -> None:
+        """
+        Initialize this strategy to spend time_budget seconds per move and
+        search no deeper than max_depth. Without an orderer, moves are
+        ordered by a MoveOrderer with a table of 100000 hash moves.
+        """
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        if orderer is None:
+            orderer = MoveOrderer(TranspositionTable(100000))
+        self.orderer = orderer
+        self.depth_reached = 0
+        self._depth = 0
+        self._deadline = 0.0
+        self._cut_off = False
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return a move for game.
+        """
+        current_state = game.current_state
+        moves = list(current_state.get_possible_moves())
+        best_move = moves[0] if moves else None
+        self._deadline = time.monotonic() + self.time_budget
+        self.depth_reached = 0
+        self.orderer.new_search()
+        depth = 1
+        while self.max_depth is None or depth <= self.max_depth:
+            self._depth = depth
+            try:
+                best_move, best_outcome = self._search_root(current_state,
+                                                            moves, depth)
+            except SearchTimeout:
+                break
+            self.depth_reached = depth
+            # Stop once the search saw the whole tree or proved a win,
+            # since searching deeper cannot change the answer.
+            if not self._cut_off or best_outcome == current_state.WIN:
+                break
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            depth += 1
+        return best_move
+
+    def _search_root(self, state: Any, moves: list, depth: int) -> tuple:
+        """
+        Return the best of moves from state, and its score, searching depth
+        plies in all.
+        """
+        self._cut_off = False
+        best_move = None
+        best_outcome = NEG_INF
+        for move in moves:
+            new_state = state.make_move(move)
+            guessed_score = self.outcome(new_state, depth - 1, NEG_INF,
+                                         -best_outcome) * -1
+            if guessed_score > best_outcome:
+                best_outcome = guessed_score
+                best_move = move
+                if best_outcome == state.WIN:
+                    break
+        return best_move, best_outcome
+
+    def outcome(self, state: Any, depth: int, alpha: float,
+                beta: float) -> float:
+        """
+        Return the fail-soft alpha-beta score of state for its current
+        player, searching depth plies and scoring the positions there with
+        half of rough_outcome(), strictly between LOSE and WIN.
+
+        Raise SearchTimeout if the deadline passes. state is then left in
+        whatever position the search had reached.
+        """
+        if time.monotonic() > self._deadline:
+            raise SearchTimeout
+        decided = state.decided_outcome()
+        if decided is not None:
+            return decided
+        moves = state.search_moves()
+        if moves == []:
+            return state.LOSE
+        if depth == 0:
+            self._cut_off = True
+            return state.rough_outcome() / 2
+        ply = self._depth - depth
+        moves = self.orderer.order(state, moves, ply)
+        best_outcome = NEG_INF
+        best_move = None
+        for move in moves:
+            if state.supports_apply:
+                state.apply(move)
+                score = -self.outcome(state, depth - 1, -beta,
+                                      -max(alpha, best_outcome))
+                state.undo()
+            else:
+                score = -self.outcome(state.make_move(move), depth - 1,
+                                      -beta, -max(alpha, best_outcome))
+            if score > best_outcome:
+                best_outcome = score
+                best_move = move
+                if best_outcome >= beta or best_outcome == state.WIN:
+                    self.orderer.record_cutoff(move, ply, depth)
+                    break
+        self.orderer.record_best(state, best_move, best_outcome)
+        return best_outcome
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,309 @@
+"""
+Monte Carlo tree search with UCT (upper confidence bounds applied to trees).
+"""
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+
+class MCTSNode:
+    """
+    A node of a Monte Carlo search tree.
+
+    state - the game state at this node
+    parent - the node this one was reached from, or None for the root
+    move - the move that led here from parent
+    children - the expanded children, by move
+    untried - the moves from state that have no child yet
+    visits - the number of playouts through this node
+    wins - the number of those playouts won by the player who made move
+    """
+    state: Any
+    parent: Any
+    move: Any
+    children: dict
+    untried: list
+    visits: int
+    wins: float
+
+    def __init__(self, state: Any, parent: 'MCTSNode' = None,
+                 move: Any = None) -> None:
+        """
+        Initialize an unvisited node for state, reached from parent by move.
+        """
+        self.state = state
+        self.parent = parent
+        self.move = move
+        self.children = {}
+        self.untried = list(state.get_possible_moves())
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self, exploration: float) -> 'MCTSNode':
+        """
+        Return the child with the highest UCT score: its win rate plus an
+        exploration bonus that shrinks as it is visited.
+        """
+        log_visits = math.log(self.visits)
+        best_child = None
+        best_score = -1.0
+        for child in self.children.values():
+            score = (child.wins / child.visits + exploration
+                     * math.sqrt(log_visits / child.visits))
+            if score > best_score:
+                best_score = score
+                best_child = child
+        return best_child
+
+    def find(self, state: Any, depth: int) -> Any:
+        """
+        Return the node for state among the nodes at most depth plies below
+        this one, or None if there is none.
+        """
+        if self.state == state:
+            return self
+        if depth > 0:
+            for child in self.children.values():
+                node = child.find(state, depth - 1)
+                if node is not None:
+                    return node
+        return None
+
+
+class MonteCarloTreeSearch:
+    """
+    A strategy that grows a search tree by random playouts, choosing which
+    branch to explore with UCT, and plays the root move that was explored
+    the most.
+
+    The search stops after playouts playouts or milliseconds milliseconds,
+    whichever comes first. The tree is kept between moves, and the next
+    search starts from the subtree under the moves actually played.
+
+    playouts - the most playouts per move, or None for no limit
+    milliseconds - the most time per move, or None for no limit
+    exploration - the UCT exploration constant
+    playouts_run - the number of playouts in the last search
+    """
+    playouts: Any
+    milliseconds: Any
+    exploration: float
+    playouts_run: int
+
+    def __init__(self, playouts: int = None, milliseconds: float = None,
+                 exploration: float = math.sqrt(2), seed: Any = None) -> None:
+        """
+        Initialize this strategy with a budget of playouts playouts and
+        milliseconds milliseconds per move, at least one of which must be
+        given, drawing random numbers from a generator seeded with seed.
+        """
+        if playouts is None and milliseconds is None:
+            raise ValueError("MCTS needs a playout or time budget")
+        self.playouts = playouts
+        self.milliseconds = milliseconds
+        self.exploration = exploration
+        self.playouts_run = 0
+        self._random = random.Random(seed)
+        self._root = None
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return a move for game: one that ends the game at once if there is
+        one, and otherwise the most explored move.
+        """
+        for move in game.current_state.get_possible_moves():
+            if game.current_state.make_move(move).get_possible_moves() == []:
+                return move
+        root = self.search(game.current_state)
+        if not root.children:
+            return None
+        return max(root.children.values(), key=lambda child: child.visits).move
+
+    def search(self, state: Any) -> MCTSNode:
+        """
+        Run playouts from state within the budget, and return the root of
+        the search tree.
+        """
+        root = None
+        if self._root is not None:
+            # Two plies down covers our last move and the opponent's reply.
+            root = self._root.find(state, 2)
+        if root is None:
+            root = MCTSNode(state)
+        root.parent = None
+        self._root = root
+        deadline = None
+        if self.milliseconds is not None:
+            deadline = time.monotonic() + self.milliseconds / 1000
+        self.playouts_run = 0
+        while ((self.playouts is None or self.playouts_run < self.playouts)
+               and (deadline is None or time.monotonic() < deadline)):
+            self._playout(root)
+            self.playouts_run += 1
+        return root
+
+    def _playout(self, root: MCTSNode) -> None:
+        """
+        Select a path from root with UCT, expand one new node at its end,
+        play randomly from there to the end of the game, and credit the
+        result to every node on the path.
+        """
+        node = root
+        while not node.untried and node.children:
+            node = node.select_child(self.exploration)
+        if node.untried:
+            move = node.untried.pop(self._random.randrange(len(node.untried)))
+            child = MCTSNode(node.state.make_move(move), node, move)
+            node.children[move] = child
+            node = child
+        # True if the player to move at node's state loses the playout.
+        mover_loses = self._rollout(node.state)
+        while node is not None:
+            node.visits += 1
+            if mover_loses:
+                node.wins += 1
+            mover_loses = not mover_loses
+            node = node.parent
+
+    def _rollout(self, state: Any) -> bool:
+        """
+        Play random moves from state to the end of the game and return
+        whether the player to move at state lost. state is left as it was.
+        """
+        moves = state.get_possible_moves()
+        if not state.supports_apply:
+            plies = 0
+            while moves:
+                state = state.make_move(self._random.choice(moves))
+                moves = state.get_possible_moves()
+                plies += 1
+            return plies % 2 == 0
+        plies = 0
+        while moves:
+            state.apply(self._random.choice(moves))
+            moves = state.get_possible_moves()
+            plies += 1
+        for _ in range(plies):
+            state.undo()
+        return plies % 2 == 0
+
+
+def root_statistics(state: Any, playouts: Any, deadline: Any,
+                    exploration: float, seed: int) -> tuple:
+    """
+    Grow a search tree from state and return the number of playouts run
+    and, for each root move, its (visits, wins). The search stops after
+    playouts playouts or at the time.time() value deadline, whichever comes
+    first. This is the job a worker process runs for RootParallelMCTS.
+    """
+    milliseconds = None
+    if deadline is not None:
+        milliseconds = max(0.0, deadline - time.time()) * 1000
+    strategy = MonteCarloTreeSearch(playouts, milliseconds, exploration, seed)
+    root = strategy.search(state)
+    return strategy.playouts_run, {move: (child.visits, child.wins)
+                                   for move, child in root.children.items()}
+
+
+class RootParallelMCTS:
+    """
+    A strategy that grows an independent Monte Carlo search tree in each of
+    workers processes, adds up the visits and wins of every root move
+    across the trees, and plays the move visited the most.
+
+    Every worker stops at the same deadline, milliseconds from the start of
+    the move, or when the playouts are used up. The playouts are split
+    evenly among the workers. Each worker's seed is drawn from a generator
+    seeded with seed, so a playout-limited search with a given seed always
+    picks the same move.
+
+    workers - the number of worker processes
+    playouts - the most playouts per move across all workers, or None for
+               no limit
+    milliseconds - the most time per move, or None for no limit
+    exploration - the UCT exploration constant
+    playouts_run - the number of playouts in the last search
+    statistics - the merged (visits, wins) of each root move in the last
+                 search
+    """
+    workers: int
+    playouts: Any
+    milliseconds: Any
+    exploration: float
+    playouts_run: int
+    statistics: dict
+
+    def __init__(self, workers: int = None, playouts: int = None,
+                 milliseconds: float = None,
+                 exploration: float = math.sqrt(2), seed: Any = None) -> None:
+        """
+        Initialize this strategy to search with workers processes, or one
+        per CPU if workers is None, within a budget of playouts playouts
+        and milliseconds milliseconds per move, at least one of which must
+        be given. The processes are started the first time a move is asked
+        for.
+        """
+        if playouts is None and milliseconds is None:
+            raise ValueError("MCTS needs a playout or time budget")
+        self.workers = workers or os.cpu_count() or 1
+        self.playouts = playouts
+        self.milliseconds = milliseconds
+        self.exploration = exploration
+        self.playouts_run = 0
+        self.statistics = {}
+        self._random = random.Random(seed)
+        self._pool = None
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return a move for game: one that ends the game at once if there is
+        one, and otherwise the move visited the most across all the trees.
+        """
+        current_state = game.current_state
+        for move in current_state.get_possible_moves():
+            if current_state.make_move(move).get_possible_moves() == []:
+                return move
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        deadline = None
+        if self.milliseconds is not None:
+            deadline = time.time() + self.milliseconds / 1000
+        futures = []
+        for i in range(self.workers):
+            playouts = None
+            if self.playouts is not None:
+                playouts = (self.playouts // self.workers
+                            + (i < self.playouts % self.workers))
+            futures.append(self._pool.submit(
+                root_statistics, current_state, playouts, deadline,
+                self.exploration, self._random.getrandbits(64)))
+        self.playouts_run = 0
+        self.statistics = {}
+        for future in futures:
+            playouts_run, statistics = future.result()
+            self.playouts_run += playouts_run
+            for move, (visits, wins) in statistics.items():
+                total_visits, total_wins = self.statistics.get(move, (0, 0))
+                self.statistics[move] = (total_visits + visits,
+                                         total_wins + wins)
+        if not self.statistics:
+            return None
+        return max(self.statistics,
+                   key=lambda move: self.statistics[move][0])
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
@@ -19,19 +19,32 @@ class IterState:
         self.score = score
 
 
+class SearchFrame:
+    """
+    One node on the path that iterative_outcome_lean is searching: the
+    node's state, an iterator over the moves not yet tried from it, and the
+    best score found among the children tried so far.
+    """
+    __slots__ = ('state', 'moves', 'best')
+
+    def __init__(self, state: Any, moves: list) -> None:
+        self.state = state
+        self.moves = iter(moves)
+        self.best = -2
+
+
 def game_is_over(current_state: Any) -> bool:
     """
     Return whether game is over.
     """
-    return current_state.get_possible_moves() == []
+    return current_state.is_terminal
 
 
 def game_is_winner(current_state: Any, player) -> bool:
     """
     Return whether game has winner
     """
-    return (current_state.get_current_player_name() != player
-            and game_is_over(current_state))
+    return current_state.winner == player
 
 
 def check_score(state: Any):
@@ -50,7 +63,7 @@ def add_children(current: IterState):
     Return list of current's children
     """
     new_items = []
-    for move in current.state.get_possible_moves():
+    for move in current.state.legal_moves:
         new_state = IterState(current.state.make_move(move))
         new_items.append(new_state)
         if current.children is None:
@@ -107,6 +120,61 @@ def iterative_outcome_tr(current_state: StonehedgeState or SubtractSquareState):
     return current_item.score
 
 
+def iterative_outcome_lean(current_state: Any) -> int:
+    """
+    Return the minimax score of current_state for its current player,
+    searching iteratively.
+
+    Only the frames on the path from current_state to the node being
+    searched are kept, so memory grows with the depth of the tree rather
+    than its size. A child is scored and dropped before the next one is
+    made, and a node stops trying moves once one of them wins. States that
+    support apply() are searched in place and restored afterwards.
+
+    >>> iterative_outcome_lean(SubtractSquareState(True, 18))
+    1
+    >>> iterative_outcome_lean(StonehedgeState(False, 1).make_move("A"))
+    -1
+    """
+    decided = current_state.decided_outcome()
+    if decided is not None:
+        return decided
+    moves = current_state.search_moves()
+    if moves == []:
+        return check_score(current_state)
+    frames = Stack()
+    frames.add(SearchFrame(current_state, moves))
+    # The score of the node that was just finished, if any, for the player
+    # to move there.
+    score = None
+    while not frames.is_empty():
+        frame = frames.remove()
+        if score is not None:
+            if frame.state.supports_apply:
+                frame.state.undo()
+            frame.best = max(frame.best, score * -1)
+            score = None
+        move = None if frame.best == 1 else next(frame.moves, None)
+        if move is None:
+            score = frame.best
+            continue
+        frames.add(frame)
+        if frame.state.supports_apply:
+            frame.state.apply(move)
+            new_state = frame.state
+        else:
+            new_state = frame.state.make_move(move)
+        decided = new_state.decided_outcome()
+        new_moves = [] if decided is not None else new_state.search_moves()
+        if decided is not None:
+            score = decided
+        elif new_moves == []:
+            score = check_score(new_state)
+        else:
+            frames.add(SearchFrame(new_state, new_moves))
+    return score
+
+
 if __name__ == "__main__":
     from python_ta import check_all
 
@@ -0,0 +1,105 @@
+"""
+Move ordering for alpha-beta searches. Trying the best move first lets a
+search cut off the remaining moves sooner.
+"""
+from typing import Any
+
+
+class MoveOrderer:
+    """
+    Puts the moves of a position in the order a search should try them: the
+    position's hash move first, then the killer moves of its ply, then the
+    rest by history score and finally by the state's move_priority().
+    Moves that tie keep the order they were given in.
+
+    table - a TranspositionTable of (score, best move) entries to take hash
+            moves from, or None
+    num_killers - how many killer moves to keep per ply
+    killers - for each ply, the latest moves that caused a cutoff at that
+              ply, newest first
+    history - for each move, the credit it has earned by causing cutoffs,
+              weighted towards cutoffs far from the leaves
+    """
+    table: Any
+    num_killers: int
+    killers: dict
+    history: dict
+
+    def __init__(self, table: Any = None, num_killers: int = 2) -> None:
+        """
+        Initialize this orderer with no killers or history, taking hash
+        moves from table.
+        """
+        self.table = table
+        self.num_killers = num_killers
+        self.killers = {}
+        self.history = {}
+
+    def order(self, state: Any, moves: list, ply: int) -> list:
+        """
+        Return moves, which are the moves of state at ply plies from the
+        root, in the order they should be searched.
+
+        >>> from stonehedge import StonehedgeState
+        >>> orderer = MoveOrderer()
+        >>> state = StonehedgeState(True, 2).make_move('A')
+        >>> orderer.order(state, state.get_possible_moves(), 0)
+        ['D', 'E', 'F', 'G', 'B', 'C']
+        >>> orderer.record_cutoff('F', 0, 3)
+        >>> orderer.order(state, state.get_possible_moves(), 0)
+        ['F', 'D', 'E', 'G', 'B', 'C']
+        """
+        hash_move = None
+        if self.table is not None:
+            entry = self.table.get(state.key())
+            if entry is not None:
+                hash_move = entry[1]
+        killers = self.killers.get(ply, [])
+        history = self.history
+
+        def rank(move: Any) -> tuple:
+            """
+            Return the sort key of move; larger keys are searched first.
+            """
+            killer_rank = (len(killers) - killers.index(move)
+                           if move in killers else 0)
+            return (move == hash_move, killer_rank, history.get(move, 0),
+                    state.move_priority(move))
+
+        return sorted(moves, key=rank, reverse=True)
+
+    def record_cutoff(self, move: Any, ply: int, depth: int) -> None:
+        """
+        Record that move caused a cutoff at ply plies from the root, with
+        depth plies left to search below it.
+        """
+        killers = self.killers.setdefault(ply, [])
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[self.num_killers:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+    def record_best(self, state: Any, move: Any, score: float) -> None:
+        """
+        Record move as the best move found from state, with score, so that
+        it becomes the hash move of state.
+        """
+        if self.table is not None:
+            self.table.store(state.key(), (score, move))
+
+    def new_search(self) -> None:
+        """
+        Prepare for a search from a new root: drop the killers, which are
+        indexed by ply from the old root, and halve the history so that
+        recent cutoffs count for more.
+        """
+        self.killers = {}
+        self.history = {move: credit // 2
+                        for move, credit in self.history.items()}
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
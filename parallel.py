@@ -0,0 +1,227 @@
+"""
+Parallel minimax: the game tree is split a few plies below the root, and
+the subtrees are solved in separate processes.
+"""
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Any
+from alphabeta import alphabeta_outcome, NEG_INF, POS_INF
+from shared_table import SharedTranspositionTable, shared_table_outcome
+
+
+def solve(state: Any, table: SharedTranspositionTable = None) -> int:
+    """
+    Return the minimax score of state for its current player, sharing
+    results through table if one is given. This is the job a worker process
+    runs on its subtree.
+    """
+    return solve_window(state, NEG_INF, POS_INF, table)
+
+
+def solve_window(state: Any, alpha: int, beta: int,
+                 table: SharedTranspositionTable = None) -> int:
+    """
+    Return the fail-soft alpha-beta score of state for its current player
+    with the window (alpha, beta), sharing results through table if one is
+    given. This is the job a worker process runs on a young brother's
+    subtree.
+    """
+    if table is None:
+        return alphabeta_outcome(state, alpha, beta)
+    return shared_table_outcome(state, alpha, beta, table)
+
+
+class ParallelMinimax:
+    """
+    A minimax strategy that solves each subtree split_depth plies below the
+    root in a pool of worker processes, then combines the subtrees' scores
+    and picks the same move as minimax_recursive would.
+
+    workers - the number of worker processes
+    split_depth - how many plies below the root the tree is split
+    table - a SharedTranspositionTable the workers share results through,
+            or None
+    """
+    workers: int
+    split_depth: int
+    table: Any
+
+    def __init__(self, workers: int = None, split_depth: int = 1,
+                 table: SharedTranspositionTable = None) -> None:
+        """
+        Initialize this strategy to use workers processes, or one per CPU
+        if workers is None, splitting the tree split_depth plies down and
+        sharing results through table. The processes are started the first
+        time a move is asked for.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.split_depth = split_depth
+        self.table = table
+        self._pool = None
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return a move for game.
+        """
+        current_state = game.current_state
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        children = self._split(current_state, self.split_depth)
+        best_move = None
+        best_outcome = NEG_INF
+        for move, child in children:
+            guessed_score = _score(child) * -1
+            if guessed_score > best_outcome:
+                best_outcome = guessed_score
+                best_move = move
+        return best_move
+
+    def _split(self, state: Any, depth: int) -> Any:
+        """
+        Return the tree below state cut off depth plies down: a list of
+        (move, subtree) pairs, with a Future for the score of each subtree
+        at the cut, or the score itself where the game has ended.
+        """
+        moves = state.get_possible_moves()
+        if moves == []:
+            return state.LOSE
+        if depth == 0:
+            return self._pool.submit(solve, state, self.table)
+        return [(move, self._split(state.make_move(move), depth - 1))
+                for move in moves]
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class YoungBrothersWait:
+    """
+    A parallel alpha-beta strategy using the young brothers wait concept.
+    At each node in the top split_depth plies, the first child (the eldest
+    brother) is searched first, in this process, to get a bound. Then the
+    remaining children (its young brothers) are queued on a pool of worker
+    processes with that bound. Workers take queued subtrees as they become
+    idle, so one large subtree does not hold up the rest. Below split_depth
+    plies the eldest brother is searched serially.
+
+    Once a young brother causes a cutoff, the subtrees still queued at that
+    node are cancelled. Subtrees a worker has already started run to the
+    end, and their scores are ignored.
+
+    workers - the number of worker processes
+    split_depth - the number of plies below the root at which nodes share
+                  their children among the workers
+    table - a SharedTranspositionTable the workers share results through,
+            or None
+    """
+    workers: int
+    split_depth: int
+    table: Any
+
+    def __init__(self, workers: int = None, split_depth: int = 2,
+                 table: SharedTranspositionTable = None) -> None:
+        """
+        Initialize this strategy to use workers processes, or one per CPU
+        if workers is None, sharing work in the top split_depth plies and
+        results through table. The processes are started the first time a
+        move is asked for.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.split_depth = split_depth
+        self.table = table
+        self._pool = None
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return a move for game. Like minimax_alphabeta, this is the first
+        move with the best score.
+        """
+        current_state = game.current_state
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        moves = current_state.get_possible_moves()
+        if moves == []:
+            return None
+        best_move = moves[0]
+        best_outcome = self.outcome(current_state.make_move(best_move),
+                                    NEG_INF, POS_INF,
+                                    self.split_depth - 1) * -1
+        if best_outcome == current_state.WIN:
+            return best_move
+        futures = [(move, self._pool.submit(solve_window,
+                                            current_state.make_move(move),
+                                            NEG_INF, -best_outcome,
+                                            self.table))
+                   for move in moves[1:]]
+        # Take the results in move order, so that ties go to the earlier
+        # move just as they do in the serial search.
+        for i, (move, future) in enumerate(futures):
+            guessed_score = future.result() * -1
+            if guessed_score > best_outcome:
+                best_outcome = guessed_score
+                best_move = move
+                if best_outcome == current_state.WIN:
+                    for _, rest in futures[i + 1:]:
+                        rest.cancel()
+                    break
+        return best_move
+
+    def outcome(self, state: Any, alpha: int, beta: int, depth: int) -> int:
+        """
+        Return the fail-soft alpha-beta score of state for its current
+        player with the window (alpha, beta), sharing the young brothers of
+        nodes in the top depth plies among the workers.
+        """
+        moves = state.get_possible_moves()
+        if moves == []:
+            return state.LOSE
+        if depth <= 0:
+            return solve_window(state, alpha, beta, self.table)
+        best_outcome = self.outcome(state.make_move(moves[0]), -beta, -alpha,
+                                    depth - 1) * -1
+        if best_outcome >= beta or best_outcome == state.WIN:
+            return best_outcome
+        window = -max(alpha, best_outcome)
+        futures = [self._pool.submit(solve_window, state.make_move(move),
+                                     -beta, window, self.table)
+                   for move in moves[1:]]
+        for future in as_completed(futures):
+            score = future.result() * -1
+            if score > best_outcome:
+                best_outcome = score
+                if best_outcome >= beta or best_outcome == state.WIN:
+                    for rest in futures:
+                        rest.cancel()
+                    break
+        return best_outcome
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+def _score(tree: Any) -> int:
+    """
+    Return the score, for the player to move, of a tree built by
+    ParallelMinimax._split, waiting for its workers as needed.
+    """
+    if isinstance(tree, Future):
+        return tree.result()
+    if isinstance(tree, list):
+        return max(_score(child) * -1 for _, child in tree)
+    return tree
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
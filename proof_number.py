@@ -0,0 +1,180 @@
+"""
+Depth-first proof-number search (df-pn), a solver that spends its effort on
+the branches that look easiest to prove or disprove.
+"""
+from typing import Any
+from transposition import TranspositionTable
+
+# Stands in for an infinite proof or disproof number.
+INFINITY = 10 ** 9
+
+
+class NodeLimitReached(Exception):
+    """
+    Raised inside a proof-number search when it has expanded as many nodes
+    as it is allowed to.
+    """
+    pass
+
+
+class ProofNumberSearch:
+    """
+    A solver that proves whether the player to move can force a win, using
+    depth-first proof-number search.
+
+    Every position has a proof number, the least number of positions that
+    would have to be solved to prove a win for the player to move, and a
+    disproof number, the least number to prove a loss. Positions not yet
+    searched count 1 for each. The search repeatedly goes down into the
+    child that is cheapest to prove, remembering the numbers it finds in a
+    transposition table, until the root is proven or disproven.
+
+    max_nodes - the most nodes one solve() may expand, or None for no limit
+    table - the proof and disproof numbers found so far, by canonical state
+            key, so mirror images share an entry. Its size is the memory
+            limit; older entries are evicted when it is full.
+    nodes - the number of nodes the last solve() expanded
+    """
+    max_nodes: Any
+    table: TranspositionTable
+    nodes: int
+
+    def __init__(self, max_nodes: int = None,
+                 max_entries: int = 1000000) -> None:
+        """
+        Initialize this solver to expand at most max_nodes nodes per solve
+        and remember at most max_entries positions.
+        """
+        self.max_nodes = max_nodes
+        self.table = TranspositionTable(max_entries)
+        self.nodes = 0
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return a move for game: a winning move if one can be proven within
+        the limits, and otherwise the move whose position looks easiest to
+        prove lost for the opponent.
+        """
+        outcome, move = self.solve(game.current_state)
+        if move is not None:
+            return move
+        state = game.current_state
+        moves = state.get_possible_moves()
+        if moves == []:
+            return None
+        return min(moves, key=lambda m: self._numbers(state.make_move(m))[1])
+
+    def solve(self, state: Any) -> tuple:
+        """
+        Return (outcome, move) for state: outcome is state.WIN if the player
+        to move can force a win, state.LOSE if they cannot, or None if the
+        limits were reached first. move is a winning move when outcome is
+        state.WIN, and None otherwise.
+
+        >>> from stonehedge import StonehedgeState
+        >>> ProofNumberSearch().solve(StonehedgeState(True, 2))
+        (1, 'D')
+        >>> ProofNumberSearch().solve(StonehedgeState(True, 2).make_move("G"))
+        (-1, None)
+        """
+        self.nodes = 0
+        try:
+            self._search(state, INFINITY, INFINITY)
+        except NodeLimitReached:
+            return None, None
+        proof, disproof = self._numbers(state)
+        if disproof == 0:
+            return state.LOSE, None
+        if proof != 0:
+            return None, None
+        for move in state.get_possible_moves():
+            if self._numbers(state.make_move(move))[1] == 0:
+                return state.WIN, move
+        return None, None
+
+    def _numbers(self, state: Any) -> tuple:
+        """
+        Return the proof and disproof numbers of state as far as they are
+        known.
+        """
+        entry = self.table.get(state.canonical_key())
+        if entry is not None:
+            return entry
+        return _settled_numbers(state) or (1, 1)
+
+    def _search(self, state: Any, proof_limit: int,
+                disproof_limit: int) -> None:
+        """
+        Search below state until its proof number reaches proof_limit or its
+        disproof number reaches disproof_limit, and store its numbers.
+        state is left as it was, though it may be changed and restored
+        along the way, even if the search stops with NodeLimitReached.
+        """
+        settled = _settled_numbers(state)
+        if settled is not None:
+            self.table.store(state.canonical_key(), settled)
+            return
+        moves = state.distinct_moves()
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise NodeLimitReached
+        while True:
+            # A child's disproof number is the cost of proving a win here
+            # through it, and its proof number adds to the cost of proving
+            # a loss here.
+            children = []
+            for move in moves:
+                children.append((self._child_numbers(state, move), move))
+            proof = min(numbers[1] for numbers, _ in children)
+            disproof = min(INFINITY,
+                           sum(numbers[0] for numbers, _ in children))
+            if proof >= proof_limit or disproof >= disproof_limit:
+                break
+            children.sort(key=lambda child: child[0][1])
+            (child_proof, child_disproof), move = children[0]
+            second = children[1][0][1] if len(children) > 1 else INFINITY
+            child_proof_limit = min(INFINITY,
+                                    disproof_limit - disproof + child_proof)
+            child_disproof_limit = min(proof_limit, second + 1)
+            if state.supports_apply:
+                state.apply(move)
+                try:
+                    self._search(state, child_proof_limit,
+                                 child_disproof_limit)
+                finally:
+                    state.undo()
+            else:
+                self._search(state.make_move(move), child_proof_limit,
+                             child_disproof_limit)
+        self.table.store(state.canonical_key(), (proof, disproof))
+
+    def _child_numbers(self, state: Any, move: Any) -> tuple:
+        """
+        Return the proof and disproof numbers of the state that move leads
+        to from state.
+        """
+        if state.supports_apply:
+            state.apply(move)
+            numbers = self._numbers(state)
+            state.undo()
+            return numbers
+        return self._numbers(state.make_move(move))
+
+
+def _settled_numbers(state: Any) -> Any:
+    """
+    Return the proof and disproof numbers of state if its outcome is already
+    decided, and None otherwise.
+    """
+    decided = state.decided_outcome()
+    if decided == state.WIN:
+        return 0, INFINITY
+    if decided == state.LOSE or state.search_moves() == []:
+        return INFINITY, 0
+    return None
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
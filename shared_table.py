@@ -0,0 +1,238 @@
+"""
+A transposition table in shared memory, so that processes searching the same
+game can use each other's results.
+"""
+from hashlib import blake2b
+from multiprocessing.shared_memory import SharedMemory
+import struct
+from typing import Any
+from alphabeta import NEG_INF
+
+# A slot is two 64-bit words: the entry's key XORed with its data, then the
+# data. A reader recomputes the key from the two words, so a slot that
+# another process was halfway through writing does not match any key and
+# reads as a miss. This keeps the table consistent without locks.
+SLOT = struct.Struct("<QQ")
+MASK_64 = (1 << 64) - 1
+
+# The kinds of score an entry holds; an all-zero slot reads as EMPTY.
+EMPTY = 0
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+# The tables this process has attached to, by name.
+_attached = {}
+
+
+def _attach(name: str, num_entries: int) -> 'SharedTranspositionTable':
+    """
+    Return this process's handle on the shared table called name, attaching
+    to it the first time it is asked for.
+    """
+    if name not in _attached:
+        _attached[name] = SharedTranspositionTable(num_entries, name)
+    return _attached[name]
+
+
+class SharedTranspositionTable:
+    """
+    A fixed-size hash table of search results in shared memory. Each entry
+    is a 16-byte record of a 64-bit key, a score, the kind of score (EXACT,
+    or a LOWER or UPPER bound), a depth and the index of the best move in
+    search_moves().
+
+    An entry goes in the slot its key picks, replacing what is there if
+    that is the same position or was searched no deeper.
+
+    Pickling a table sends only its name, so a table passed to a worker
+    process attaches that worker to the same memory.
+
+    name - the name of the shared memory block
+    num_entries - the number of slots
+    """
+    name: str
+    num_entries: int
+
+    def __init__(self, num_entries: int = 1 << 20, name: str = None) -> None:
+        """
+        Create a new, empty table of num_entries slots, or attach to the
+        existing table called name.
+        """
+        self.num_entries = num_entries
+        self._owner = name is None
+        if self._owner:
+            self._memory = SharedMemory(create=True,
+                                        size=num_entries * SLOT.size)
+        else:
+            self._memory = SharedMemory(name=name)
+        self.name = self._memory.name
+        self._buffer = self._memory.buf
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickle this table as its name and size.
+        """
+        return _attach, (self.name, self.num_entries)
+
+    @staticmethod
+    def key_of(state: Any) -> int:
+        """
+        Return the 64-bit key of state in a shared table. It is the same in
+        every process, however the process was started.
+
+        A state's key() is used as it is if it is an int that fits, and
+        states that keep a 64-bit Zobrist hash use that. Any other key is
+        hashed to 64 bits.
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> SharedTranspositionTable.key_of(SubtractSquareState(True, 18))
+        37
+        """
+        key = state.key()
+        if isinstance(key, int) and 0 <= key <= MASK_64:
+            return key
+        zobrist = getattr(state, 'zobrist', None)
+        if zobrist is not None:
+            return zobrist
+        return int.from_bytes(blake2b(_stable_bytes(key),
+                                      digest_size=8).digest(), "little")
+
+    def lookup(self, key: int) -> Any:
+        """
+        Return the (score, kind, depth, move index) entry for key, or None
+        if the table holds none.
+
+        >>> table = SharedTranspositionTable(16)
+        >>> table.store(42, -1, UPPER, 3, 2)
+        >>> table.lookup(42)
+        (-1, 3, 3, 2)
+        >>> table.lookup(58) is None
+        True
+        >>> table.close()
+        """
+        check, data = SLOT.unpack_from(self._buffer,
+                                       key % self.num_entries * SLOT.size)
+        if check ^ data != key or data >> 8 & 0xFF == EMPTY:
+            return None
+        return ((data & 0xFF) - 128, data >> 8 & 0xFF, data >> 16 & 0xFFFF,
+                data >> 32 & 0xFFFF)
+
+    def store(self, key: int, score: int, kind: int, depth: int,
+              move_index: int) -> None:
+        """
+        Store an entry for key, unless its slot holds a different position
+        that was searched deeper.
+        """
+        offset = key % self.num_entries * SLOT.size
+        check, data = SLOT.unpack_from(self._buffer, offset)
+        if (check ^ data != key and data >> 8 & 0xFF != EMPTY
+                and data >> 16 & 0xFFFF > depth):
+            return
+        data = ((score + 128) | kind << 8 | min(depth, 0xFFFF) << 16
+                | min(move_index, 0xFFFF) << 32)
+        SLOT.pack_into(self._buffer, offset, key ^ data, data)
+
+    def clear(self) -> None:
+        """
+        Empty every slot.
+        """
+        self._buffer[:] = bytes(len(self._buffer))
+
+    def close(self) -> None:
+        """
+        Detach this process from the table, and free the memory if this
+        process created it.
+        """
+        self._buffer = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+def _stable_bytes(key: Any) -> bytes:
+    """
+    Return bytes that stand for key and do not change from one process to
+    the next. Functions, whose repr() holds their address, are named by
+    where they are defined instead.
+
+    >>> from subtract_square_state import squares
+    >>> _stable_bytes(((1, 2), squares))
+    b'((1,2),subtract_square_state.squares)'
+    """
+    if callable(key):
+        return "{}.{}".format(key.__module__, key.__qualname__).encode()
+    if isinstance(key, tuple):
+        return b"(" + b",".join(_stable_bytes(part) for part in key) + b")"
+    return repr(key).encode()
+
+
+def shared_table_outcome(state: Any, alpha: int, beta: int,
+                         table: SharedTranspositionTable) -> int:
+    """
+    Return the fail-soft alpha-beta score of state for its current player
+    with the window (alpha, beta), reusing and adding to the results in
+    table. A stored best move is tried first.
+
+    >>> from subtract_square_state import SubtractSquareState
+    >>> table = SharedTranspositionTable(64)
+    >>> shared_table_outcome(SubtractSquareState(True, 18), -2, 2, table)
+    1
+    >>> table.lookup(SharedTranspositionTable.key_of(
+    ...     SubtractSquareState(True, 18)))[:2]
+    (1, 1)
+    >>> table.close()
+    """
+    decided = state.decided_outcome()
+    if decided is not None:
+        return decided
+    moves = state.search_moves()
+    if moves == []:
+        return state.LOSE
+    key = table.key_of(state)
+    entry = table.lookup(key)
+    order = list(range(len(moves)))
+    if entry is not None:
+        score, kind, _, move_index = entry
+        if (kind == EXACT or (kind == LOWER and score >= beta)
+                or (kind == UPPER and score <= alpha)):
+            return score
+        if move_index < len(moves):
+            order.remove(move_index)
+            order.insert(0, move_index)
+    best_outcome = NEG_INF
+    best_index = 0
+    for i in order:
+        if state.supports_apply:
+            state.apply(moves[i])
+            score = -shared_table_outcome(state, -beta,
+                                          -max(alpha, best_outcome), table)
+            state.undo()
+        else:
+            score = -shared_table_outcome(state.make_move(moves[i]), -beta,
+                                          -max(alpha, best_outcome), table)
+        if score > best_outcome:
+            best_outcome = score
+            best_index = i
+            if best_outcome >= beta or best_outcome == state.WIN:
+                break
+    if best_outcome in (state.WIN, state.LOSE):
+        # Nothing scores outside [LOSE, WIN], so these are exact even when
+        # they came from a cutoff.
+        kind = EXACT
+    elif best_outcome <= alpha:
+        kind = UPPER
+    elif best_outcome >= beta:
+        kind = LOWER
+    else:
+        kind = EXACT
+    # The number of moves left stands in for the depth searched, which an
+    # exhaustive search does not track.
+    table.store(key, best_outcome, kind, len(moves), best_index)
+    return best_outcome
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
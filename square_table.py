@@ -0,0 +1,156 @@
+"""
+A table of which SubtractSquare totals are lost for the player to move,
+worked out for every total up to a limit at once, so that SubtractSquare can
+be played perfectly without searching.
+
+numpy is only imported once a table is worked out or opened, so the
+strategy can be registered without it.
+"""
+import os
+from typing import Any
+from subtract_square_state import SubtractSquareState
+from strategy import minimax_alphabeta
+
+
+def losing_totals(limit: int) -> Any:
+    """
+    Return an array of whether each total from 0 to limit is lost for the
+    player to move.
+
+    A total is lost if no square leads to a lost total. The smallest total
+    not yet known to be won is lost, and every lost total plus a square is
+    won, so the table is filled in by finding each lost total in turn and
+    marking all of its square offsets in one step.
+
+    >>> [total for total in range(40) if losing_totals(40)[total]]
+    [0, 2, 5, 7, 10, 12, 15, 17, 20, 22, 34, 39]
+    """
+    import numpy as np
+
+    won = np.zeros(limit + 1, dtype=bool)
+    squares = np.arange(1, int(np.sqrt(limit)) + 2, dtype=np.int64) ** 2
+    squares = squares[squares <= limit]
+    # Lost totals are far apart for large totals, so the next one is looked
+    # for a chunk at a time rather than a total at a time.
+    chunk = 1024
+    total = 0
+    while total <= limit:
+        offsets = squares[:np.searchsorted(squares, limit - total,
+                                           side="right")]
+        won[total + offsets] = True
+        total += 1
+        while total <= limit:
+            window = won[total:total + chunk]
+            first = int(np.argmin(window))
+            if not window[first]:
+                total += first
+                break
+            total += window.size
+    return ~won
+
+
+class SquareTable:
+    """
+    Whether each SubtractSquare total up to a limit is lost for the player
+    to move, kept one bit per total in a memory-mapped file.
+
+    limit - the largest total in this table
+    """
+    limit: int
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the table saved at path.
+        """
+        import numpy as np
+
+        self._bits = np.load(path, mmap_mode="r")
+        self.limit = self._bits.size * 8 - 1
+        self._squares = np.arange(1, int(np.sqrt(self.limit)) + 2,
+                                  dtype=np.int64) ** 2
+
+    @staticmethod
+    def build(limit: int, path: str) -> 'SquareTable':
+        """
+        Work out the table for totals up to at least limit, save it to path
+        and return it.
+        """
+        import numpy as np
+
+        # Round up so that the bits fill whole bytes.
+        limit = limit | 7
+        np.save(path, np.packbits(losing_totals(limit), bitorder="little"))
+        return SquareTable(path)
+
+    def is_losing(self, total: int) -> bool:
+        """
+        Return whether total is lost for the player to move.
+
+        Precondition: 0 <= total <= self.limit
+        """
+        return bool(self._bits[total >> 3] >> (total & 7) & 1)
+
+    def best_move(self, total: int) -> int:
+        """
+        Return the smallest square that leaves the opponent with a lost
+        total, or 1 if there is none.
+
+        Precondition: 1 <= total <= self.limit
+        """
+        import numpy as np
+
+        if self.is_losing(total):
+            return 1
+        left = total - self._squares[:np.searchsorted(self._squares, total,
+                                                      side="right")]
+        losing = self._bits[left >> 3] >> (left & 7) & 1
+        return int(total - left[np.argmax(losing)])
+
+
+class SquareTableStrategy:
+    """
+    A strategy that plays SubtractSquare perfectly from a SquareTable, and
+    falls back on minimax_alphabeta for any other game.
+
+    The table is loaded from path if it is there and reaches far enough,
+    and otherwise built and saved there the first time it is needed.
+
+    limit - the largest total to build a table for, unless a game starts
+            higher
+    path - where the table is saved
+    table - the table in use, or None before the first move
+    """
+    limit: int
+    path: str
+    table: Any
+
+    def __init__(self, limit: int = 10 ** 7,
+                 path: str = "subtract_square.npy") -> None:
+        """
+        Initialize this strategy to use a table of totals up to limit saved
+        at path.
+        """
+        self.limit = limit
+        self.path = path
+        self.table = None
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return a move for game that wins if any move does.
+        """
+        if not isinstance(game.current_state, SubtractSquareState):
+            return minimax_alphabeta(game)
+        total = game.current_state.current_total
+        if self.table is None or self.table.limit < total:
+            if os.path.exists(self.path):
+                self.table = SquareTable(self.path)
+            if self.table is None or self.table.limit < total:
+                self.table = SquareTable.build(max(self.limit, total),
+                                               self.path)
+        return self.table.best_move(total)
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
@@ -1,17 +1,245 @@
 """Stonehedge"""
 
 
+import random
 from typing import Any
 from game import Game
 from game_state import GameState
 
 
+# Cell letters in board order; a board of size n uses the first
+# NUM_CELLS[n - 1] of them.
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXY"
+NUM_CELLS = [3, 7, 12, 18, 25]
+NUM_LEYLINES = [6, 9, 12, 15, 18]
+_CELL_INDEX = {letter: i for i, letter in enumerate(LETTERS)}
+
+# The cells on each leyline, keyed by board size then leyline index.
+_LEYLINE_LETTERS = {
+    1: {0: "A", 1: "BC", 2: "AB", 3: "C", 4: "B", 5: "AC"},
+    2: {0: "AC", 1: "BDF", 2: "AB", 3: "EG", 4: "CDE", 5: "FG", 6: "BE",
+        7: "CF", 8: "ADG"},
+    3: {0: "ACF", 1: "BDGJ", 2: "AB", 3: "EHK", 4: "CDE", 5: "LI",
+        6: "FGHI", 7: "JKL", 8: "BEI", 9: "FJ", 10: "CGK", 11: "ADHL"},
+    4: {0: "ACFJ", 1: "BDGKO", 2: "AB", 3: "PLHE", 4: "CDE", 5: "QMI",
+        6: "FGHI", 7: "RN", 8: "JKLMN", 9: "OPQR", 10: "BEIN", 11: "OJ",
+        12: "FKP", 13: "CGLQ", 14: "ADHMR"},
+    5: {0: "ACFJO", 1: "BDGKPU", 2: "AB", 3: "EHLQV", 4: "CDE", 5: "IMRW",
+        6: "FGHI", 7: "NSX", 8: "JKLMN", 9: "TY", 10: "OPQRST",
+        11: "UVXWY", 12: "TMHDA", 13: "UO", 14: "VPJ", 15: "WQKF",
+        16: "XRLGC", 17: "YSMHDA"}
+}
+
+
+class Topology:
+    """
+    The fixed layout of a Stonehedge board of one size, shared by every
+    state on that board. Cells and leylines are referred to by index.
+
+    size - the side length of the board
+    num_cells - the number of cells on the board
+    num_leylines - the number of leylines on the board
+    leyline_cells - the cells on each leyline
+    cell_leylines - the leylines through each cell
+    leyline_masks - the bitmask of the cells on each leyline
+    thresholds - the number of cells needed to capture each leyline
+    to_win - the number of leylines needed to win
+    cell_keys - the Zobrist key of each cell, for p1 then for p2
+    leyline_keys - the Zobrist key of each leyline, for p1 then for p2
+    turn_key - the Zobrist key of it being p1's turn
+    symmetries - the permutations of cells that map every leyline onto a
+                 leyline, each paired with the permutation of leylines it
+                 induces; the identity comes first
+    symmetry_maps - for each symmetry, the image of every byte of a packed
+                    position (see StonehedgeState._packed)
+    """
+    size: int
+    num_cells: int
+    num_leylines: int
+    leyline_cells: tuple
+    cell_leylines: tuple
+    leyline_masks: tuple
+    thresholds: tuple
+    to_win: int
+    cell_keys: tuple
+    leyline_keys: tuple
+    turn_key: int
+    symmetries: tuple
+    symmetry_maps: tuple
+
+    def __init__(self, board_size: int) -> None:
+        """
+        Initialize the layout of a board with side length board_size.
+
+        >>> topology = Topology(1)
+        >>> topology.leyline_cells
+        ((0,), (1, 2), (0, 1), (2,), (1,), (0, 2))
+        >>> topology.cell_leylines
+        ((0, 2, 5), (1, 2, 4), (1, 3, 5))
+        """
+        self.size = board_size
+        self.num_cells = NUM_CELLS[board_size - 1]
+        self.num_leylines = NUM_LEYLINES[board_size - 1]
+        self.leyline_cells = tuple(
+            tuple(_CELL_INDEX[letter]
+                  for letter in _LEYLINE_LETTERS[board_size][i])
+            for i in range(self.num_leylines))
+        self.cell_leylines = tuple(
+            tuple(i for i in range(self.num_leylines)
+                  if cell in self.leyline_cells[i])
+            for cell in range(self.num_cells))
+        self.leyline_masks = tuple(sum(1 << cell for cell in line)
+                                   for line in self.leyline_cells)
+        self.thresholds = tuple((len(line) + 1) // 2
+                                for line in self.leyline_cells)
+        self.to_win = (self.num_leylines + 1) // 2
+        # Seeded by size so that every process agrees on the keys.
+        rng = random.Random(board_size)
+        self.cell_keys = tuple(
+            tuple(rng.getrandbits(64) for _ in range(self.num_cells))
+            for _ in range(2))
+        self.leyline_keys = tuple(
+            tuple(rng.getrandbits(64) for _ in range(self.num_leylines))
+            for _ in range(2))
+        self.turn_key = rng.getrandbits(64)
+        self.symmetries = _find_symmetries(self.num_cells,
+                                           self.leyline_cells)
+        # A packed position holds p1's cells, p2's cells, p1's leylines and
+        # p2's leylines one after the other.
+        cells, leylines = self.num_cells, self.num_leylines
+        self.symmetry_maps = tuple(
+            _byte_maps([cell_image[i % cells] + i // cells * cells
+                        for i in range(2 * cells)]
+                       + [2 * cells + leyline_image[i % leylines]
+                          + i // leylines * leylines
+                          for i in range(2 * leylines)],
+                       2 * (cells + leylines))
+            for cell_image, leyline_image in self.symmetries)
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickle this layout as its board size, so that unpickling it in
+        another process finds that process's copy in the registry.
+        """
+        return get_topology, (self.size,)
+
+
+def _find_symmetries(num_cells: int, leyline_cells: tuple) -> tuple:
+    """
+    Return every permutation of num_cells cells that maps each leyline in
+    leyline_cells onto a leyline, paired with the permutation of leylines
+    it induces, with the identity first.
+
+    Cells are assigned images one at a time, and an image is only tried if
+    it shares as many leylines with the images so far as the cell does with
+    their preimages, which rules out almost every partial assignment early.
+
+    >>> _find_symmetries(2, ((0,), (0, 1)))
+    (((0, 1), (0, 1)),)
+    >>> len(_find_symmetries(3, ((0,), (1, 2), (0, 1), (2,), (1,), (0, 2))))
+    6
+    """
+    lines = [frozenset(line) for line in leyline_cells]
+    shared = [[sum(1 for line in lines if a in line and b in line)
+               for b in range(num_cells)] for a in range(num_cells)]
+    lengths = [sorted(len(line) for line in lines if cell in line)
+               for cell in range(num_cells)]
+    symmetries = []
+    image = []
+
+    def extend() -> None:
+        """
+        Try every image for the next cell that keeps image consistent.
+        """
+        cell = len(image)
+        if cell == num_cells:
+            leylines = []
+            for line in lines:
+                mapped = frozenset(image[c] for c in line)
+                matches = [i for i, other in enumerate(lines)
+                           if other == mapped and i not in leylines]
+                if matches == []:
+                    return
+                leylines.append(matches[0])
+            symmetries.append((tuple(image), tuple(leylines)))
+            return
+        for target in range(num_cells):
+            if (target not in image and lengths[target] == lengths[cell]
+                    and all(shared[cell][c] == shared[target][image[c]]
+                            for c in range(cell))):
+                image.append(target)
+                extend()
+                image.pop()
+
+    extend()
+    return tuple(symmetries)
+
+
+def _byte_maps(permutation: tuple, size: int) -> tuple:
+    """
+    Return, for each byte of a mask of size bits, the image under
+    permutation of every value that byte can take.
+
+    >>> _byte_maps((1, 0, 2), 3)[0][0b011], _byte_maps((1, 0, 2), 3)[0][0b001]
+    (3, 2)
+    """
+    return tuple(tuple(sum(1 << permutation[8 * chunk + bit]
+                           for bit in range(8)
+                           if value >> bit & 1 and 8 * chunk + bit < size)
+                       for value in range(256))
+                 for chunk in range((size + 7) // 8))
+
+
+def _map_mask(mask: int, byte_maps: tuple) -> int:
+    """
+    Return the image of mask under the permutation that byte_maps describe.
+
+    >>> _map_mask(0b001, _byte_maps((1, 0, 2), 3))
+    2
+    """
+    image = 0
+    for chunk in byte_maps:
+        image |= chunk[mask & 255]
+        mask >>= 8
+    return image
+
+
+_TOPOLOGIES = {}
+
+
+def get_topology(board_size: int) -> Topology:
+    """
+    Return the layout of a board with side length board_size, building it
+    the first time that size is asked for.
+
+    >>> get_topology(2) is get_topology(2)
+    True
+    """
+    if board_size not in _TOPOLOGIES:
+        _TOPOLOGIES[board_size] = Topology(board_size)
+    return _TOPOLOGIES[board_size]
+
+
 class StonehedgeState(GameState):
     """
     The state of a game at a certain point in time
     p1_turn - whether it is p1's turn or not
+
+    Claimed cells and captured leylines are kept as one bitmask per player;
+    bit i of a cell mask is the cell LETTERS[i] and bit i of a leyline mask
+    is leyline i. cells and leylines are list views built from these masks.
+    Alongside the masks each state keeps how many cells each player holds on
+    every leyline and how many leylines each player has captured, so a move
+    only has to look at the leylines through the claimed cell.
+
+    zobrist - a 64-bit hash of the position and player to move, updated
+              incrementally as cells and leylines change hands
     """
+    __slots__ = ('size', '_topology', '_p1_cells', '_p2_cells',
+                 '_p1_leylines', '_p2_leylines', '_counts', '_p1_captured',
+                 '_p2_captured', '_history', 'zobrist')
     p1_turn: bool
+    supports_apply = True
 
     def __init__(self, is_p1_turn: bool, board_size: int,
                  leylines=None, cells=None) -> None:
@@ -21,63 +249,187 @@ class StonehedgeState(GameState):
         """
         super().__init__(is_p1_turn)
         self.size = board_size
+        self._topology = get_topology(board_size)
+        masks = [0, 0, 0, 0]
+        for i, owner in enumerate(cells or []):
+            if owner in (1, 2):
+                masks[owner - 1] |= 1 << i
+        for i, owner in enumerate(leylines or []):
+            if owner in (1, 2):
+                masks[owner + 1] |= 1 << i
+        self._set_masks(*masks)
 
-        if leylines is None:
-            self.leylines = []
-            num_leylines = [6, 9, 12, 15, 18]
-            w = "@"
-            for _x in range(num_leylines[board_size - 1]):
-                self.leylines.append(w)
-        else:
-            self.leylines = leylines
-        if cells is None:
-            self.cells = []
-            d = ["A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L",
-                 "M",
-                 "N", "O", "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y"]
-            num_cells = [3, 7, 12, 18, 25]
-            for i in range(num_cells[board_size - 1]):
-                self.cells.append(d[i])
+    def _set_masks(self, p1_cells: int, p2_cells: int, p1_leylines: int,
+                   p2_leylines: int) -> None:
+        """
+        Set this state's cells and leylines to the given masks, and work out
+        everything kept alongside them.
+        """
+        topology = self._topology
+        self._p1_cells = p1_cells
+        self._p2_cells = p2_cells
+        self._p1_leylines = p1_leylines
+        self._p2_leylines = p2_leylines
+        # _counts[i] is p1's claim count on leyline i and
+        # _counts[num_leylines + i] is p2's.
+        self._counts = bytearray(
+            [(p1_cells & mask).bit_count()
+             for mask in topology.leyline_masks]
+            + [(p2_cells & mask).bit_count()
+               for mask in topology.leyline_masks])
+        self._p1_captured = p1_leylines.bit_count()
+        self._p2_captured = p2_leylines.bit_count()
+        self._history = []
+        self.zobrist = topology.turn_key if self.p1_turn else 0
+        for player, cell_mask, leyline_mask in (
+                (0, p1_cells, p1_leylines), (1, p2_cells, p2_leylines)):
+            for i in range(topology.num_cells):
+                if cell_mask >> i & 1:
+                    self.zobrist ^= topology.cell_keys[player][i]
+            for i in range(topology.num_leylines):
+                if leyline_mask >> i & 1:
+                    self.zobrist ^= topology.leyline_keys[player][i]
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickle this state as its key(), which holds everything else a state
+        is worked out from. Anything remembered for undo() is left behind.
+        >>> import pickle
+        >>> state = StonehedgeState(True, 5).make_move("M")
+        >>> pickle.loads(pickle.dumps(state)) == state
+        True
+        >>> len(pickle.dumps(state)) < 64
+        True
+        """
+        return _state_from_key, (self.key(),)
+
+    def _copy(self) -> 'StonehedgeState':
+        """
+        Return a copy of this state that can be changed without affecting
+        this one.
+        """
+        state = StonehedgeState.__new__(StonehedgeState)
+        state.p1_turn = self.p1_turn
+        state.size = self.size
+        state._topology = self._topology
+        state._p1_cells = self._p1_cells
+        state._p2_cells = self._p2_cells
+        state._p1_leylines = self._p1_leylines
+        state._p2_leylines = self._p2_leylines
+        state._counts = self._counts[:]
+        state._p1_captured = self._p1_captured
+        state._p2_captured = self._p2_captured
+        state._history = []
+        state.zobrist = self.zobrist
+        state._legal_moves = None
+        return state
+
+    def _claim(self, cell: int) -> None:
+        """
+        Claim cell for the current player, capture any leyline through it
+        that the claim completes, and pass the turn.
+        """
+        topology = self._topology
+        counts = self._counts
+        captured = self._p1_leylines | self._p2_leylines
+        if self.p1_turn:
+            self._p1_cells |= 1 << cell
+            self.zobrist ^= topology.cell_keys[0][cell]
+            for i in topology.cell_leylines[cell]:
+                counts[i] += 1
+                if (counts[i] >= topology.thresholds[i]
+                        and not captured >> i & 1):
+                    self._p1_leylines |= 1 << i
+                    self._p1_captured += 1
+                    self.zobrist ^= topology.leyline_keys[0][i]
         else:
-            self.cells = cells
+            self._p2_cells |= 1 << cell
+            self.zobrist ^= topology.cell_keys[1][cell]
+            offset = topology.num_leylines
+            for i in topology.cell_leylines[cell]:
+                counts[offset + i] += 1
+                if (counts[offset + i] >= topology.thresholds[i]
+                        and not captured >> i & 1):
+                    self._p2_leylines |= 1 << i
+                    self._p2_captured += 1
+                    self.zobrist ^= topology.leyline_keys[1][i]
+        self.p1_turn = not self.p1_turn
+        self.zobrist ^= topology.turn_key
+
+    @property
+    def cells(self) -> list:
+        """
+        Return the cells of this board in order: 1 or 2 for a cell claimed by
+        that player, otherwise the cell's letter.
+        >>> StonehedgeState(True, 1).make_move("B").cells
+        ['A', 1, 'C']
+        """
+        cells = []
+        for i in range(self._topology.num_cells):
+            if self._p1_cells >> i & 1:
+                cells.append(1)
+            elif self._p2_cells >> i & 1:
+                cells.append(2)
+            else:
+                cells.append(LETTERS[i])
+        return cells
+
+    @property
+    def leylines(self) -> list:
+        """
+        Return the leylines of this board in order: 1 or 2 for a leyline
+        captured by that player, otherwise '@'.
+        >>> StonehedgeState(True, 1).make_move("B").leylines
+        ['@', 1, 1, '@', 1, '@']
+        """
+        leylines = []
+        for i in range(self._topology.num_leylines):
+            if self._p1_leylines >> i & 1:
+                leylines.append(1)
+            elif self._p2_leylines >> i & 1:
+                leylines.append(2)
+            else:
+                leylines.append("@")
+        return leylines
 
     def __str__(self) -> str:
         """
         Return a string representation of the current state of the game.
         """
+        leylines, cells = self.leylines, self.cells
         if self.size == 1:
             return """      {}   {} \n     /   / \n{} - {} - {} \n     \\ / \\
   {} - {}   {} \n       \\\n        {}""". \
-                format(self.leylines[0], self.leylines[1], self.leylines[2],
-                       self.cells[0], self.cells[1], self.leylines[3],
-                       self.cells[2], self.leylines[4], self.leylines[5])
+                format(leylines[0], leylines[1], leylines[2],
+                       cells[0], cells[1], leylines[3],
+                       cells[2], leylines[4], leylines[5])
         elif self.size == 2:
             return """           {}   {}\n          /   / 
      {} - {} - {}   {} \n        / \\ / \\ / \n  {}  - {} - {} - {} 
         \\ / \\ / \\ \n     {} - {} - {}   {} 
           \\   \\\n           {}   {}""". \
-                format(self.leylines[0], self.leylines[1], self.leylines[2],
-                       self.cells[0], self.cells[1], self.leylines[3],
-                       self.leylines[4], self.cells[2], self.cells[3],
-                       self.cells[4], self.leylines[5], self.cells[5],
-                       self.cells[6], self.leylines[6], self.leylines[7],
-                       self.leylines[8])
+                format(leylines[0], leylines[1], leylines[2],
+                       cells[0], cells[1], leylines[3],
+                       leylines[4], cells[2], cells[3],
+                       cells[4], leylines[5], cells[5],
+                       cells[6], leylines[6], leylines[7],
+                       leylines[8])
         elif self.size == 3:
             return """            {}   {}\n            /   / 
       {} - {} - {}   {}\n         / \\ / \\ /
     {} - {} - {} - {}   {}\n       / \\ / \\ / \\ /
   {} - {} - {} - {} - {}\n       \\ / \\ / \\ / \\
     {} - {} - {} - {}   {}\n         \\   \\   \\
-         {}   {}   {}""".format(self.leylines[0], self.leylines[1],
-                                self.leylines[2], self.cells[0],
-                                self.cells[1], self.leylines[3],
-                                self.leylines[4], self.cells[2], self.cells[3],
-                                self.cells[4], self.leylines[5],
-                                self.leylines[6], self.cells[5], self.cells[6],
-                                self.cells[7], self.cells[8], self.leylines[7],
-                                self.cells[9], self.cells[10], self.cells[11],
-                                self.leylines[8], self.leylines[9],
-                                self.leylines[10], self.leylines[11])
+         {}   {}   {}""".format(leylines[0], leylines[1],
+                                leylines[2], cells[0],
+                                cells[1], leylines[3],
+                                leylines[4], cells[2], cells[3],
+                                cells[4], leylines[5],
+                                leylines[6], cells[5], cells[6],
+                                cells[7], cells[8], leylines[7],
+                                cells[9], cells[10], cells[11],
+                                leylines[8], leylines[9],
+                                leylines[10], leylines[11])
         elif self.size == 4:
             return """              {}   {}\n             /   /
         {} - {} - {}   {}\n           / \\ / \\ /
@@ -86,23 +438,23 @@ class StonehedgeState(GameState):
        / \\ / \\ / \\ / \\ /\n  {} - {} - {} - {} - {} - {}   
        \\ / \\ / \\ / \\ / \\\n    {} - {} - {} - {} - {}   {}
          \\   \\   \\   \\
-          {}   {}   {}   {}""".format(self.leylines[0], self.leylines[1],
-                                      self.leylines[2], self.cells[0],
-                                      self.cells[1], self.leylines[3],
-                                      self.leylines[4], self.cells[2],
-                                      self.cells[3], self.cells[4],
-                                      self.leylines[5], self.leylines[6],
-                                      self.cells[5], self.cells[6],
-                                      self.cells[7], self.cells[8],
-                                      self.leylines[7], self.leylines[8],
-                                      self.cells[9], self.cells[10],
-                                      self.cells[11], self.cells[12],
-                                      self.cells[13], self.leylines[9],
-                                      self.cells[14], self.cells[15],
-                                      self.cells[16], self.cells[17],
-                                      self.leylines[10], self.leylines[11],
-                                      self.leylines[12], self.leylines[13],
-                                      self.leylines[14])
+          {}   {}   {}   {}""".format(leylines[0], leylines[1],
+                                      leylines[2], cells[0],
+                                      cells[1], leylines[3],
+                                      leylines[4], cells[2],
+                                      cells[3], cells[4],
+                                      leylines[5], leylines[6],
+                                      cells[5], cells[6],
+                                      cells[7], cells[8],
+                                      leylines[7], leylines[8],
+                                      cells[9], cells[10],
+                                      cells[11], cells[12],
+                                      cells[13], leylines[9],
+                                      cells[14], cells[15],
+                                      cells[16], cells[17],
+                                      leylines[10], leylines[11],
+                                      leylines[12], leylines[13],
+                                      leylines[14])
         elif self.size == 5:
             return """              {}   {}\n             /   /
         {} - {} - {}   {}\n           / \\ / \\ /
@@ -112,28 +464,28 @@ class StonehedgeState(GameState):
      / \\ / \\ / \\ / \\ / \\ /\n{} - {} - {} - {} - {} - {}   {}
      \\ / \\ / \\ / \\ / \\ / \\\n  {} - {} - {} - {} - {} - {}   {}
        \\   \\   \\   \\   \\
-        {}   {}   {}   {}   {}""".format(self.leylines[0], self.leylines[1],
-                                         self.leylines[2], self.cells[0],
-                                         self.cells[1], self.leylines[3],
-                                         self.leylines[4], self.cells[2],
-                                         self.cells[3], self.cells[4],
-                                         self.leylines[5], self.leylines[6],
-                                         self.cells[5], self.cells[6],
-                                         self.cells[7], self.cells[8],
-                                         self.leylines[7], self.leylines[8],
-                                         self.cells[9], self.cells[10],
-                                         self.cells[11], self.cells[12],
-                                         self.cells[13], self.leylines[9],
-                                         self.leylines[10], self.cells[14],
-                                         self.cells[15], self.cells[16],
-                                         self.cells[17], self.cells[18],
-                                         self.cells[19], self.leylines[11],
-                                         self.cells[20], self.cells[21],
-                                         self.cells[22], self.cells[23],
-                                         self.cells[24], self.leylines[12],
-                                         self.leylines[13], self.leylines[14],
-                                         self.leylines[15], self.leylines[16],
-                                         self.leylines[17])
+        {}   {}   {}   {}   {}""".format(leylines[0], leylines[1],
+                                         leylines[2], cells[0],
+                                         cells[1], leylines[3],
+                                         leylines[4], cells[2],
+                                         cells[3], cells[4],
+                                         leylines[5], leylines[6],
+                                         cells[5], cells[6],
+                                         cells[7], cells[8],
+                                         leylines[7], leylines[8],
+                                         cells[9], cells[10],
+                                         cells[11], cells[12],
+                                         cells[13], leylines[9],
+                                         leylines[10], cells[14],
+                                         cells[15], cells[16],
+                                         cells[17], cells[18],
+                                         cells[19], leylines[11],
+                                         cells[20], cells[21],
+                                         cells[22], cells[23],
+                                         cells[24], leylines[12],
+                                         leylines[13], leylines[14],
+                                         leylines[15], leylines[16],
+                                         leylines[17])
         return ""
 
     def get_possible_moves(self) -> list:
@@ -142,11 +494,104 @@ class StonehedgeState(GameState):
         >>> StonehedgeState(True, 1).get_possible_moves()
         ['A', 'B', 'C']
         """
+        if self.is_over():
+            return []
+        claimed = self._p1_cells | self._p2_cells
+        return [LETTERS[i] for i in range(self._topology.num_cells)
+                if not claimed >> i & 1]
+
+    def _live_cells(self) -> int:
+        """
+        Return the mask of the cells on at least one uncaptured leyline.
+        """
+        captured = self._p1_leylines | self._p2_leylines
+        live = 0
+        for i, mask in enumerate(self._topology.leyline_masks):
+            if not captured >> i & 1:
+                live |= mask
+        return live
+
+    def dead_cells(self) -> list:
+        """
+        Return the unclaimed cells whose leylines have all been captured.
+        Claiming one of them changes nothing but whose turn it is, so they
+        are all equally good moves.
+        >>> state = StonehedgeState(True, 3)
+        >>> for move in "FHKDCIBJ":
+        ...     state = state.make_move(move)
+        >>> state.dead_cells()
+        ['A', 'G']
+        """
+        dead = ~(self._p1_cells | self._p2_cells | self._live_cells())
+        return [LETTERS[i] for i in range(self._topology.num_cells)
+                if dead >> i & 1]
+
+    def search_moves(self) -> list:
+        """
+        Return the moves of get_possible_moves(), keeping only the first of
+        any dead cells, since claiming one dead cell plays the same as
+        claiming any other.
+        >>> state = StonehedgeState(True, 3)
+        >>> for move in "FHKDCIBJ":
+        ...     state = state.make_move(move)
+        >>> state.search_moves()
+        ['A', 'E', 'L']
+        """
+        if self.is_over():
+            return []
+        claimed = self._p1_cells | self._p2_cells
+        live = self._live_cells()
         moves = []
-        for x in self.cells:
-            if isinstance(x, str):
-                moves.append(x)
-        return [] if self.is_over() else moves
+        dead_seen = False
+        for i in range(self._topology.num_cells):
+            if not claimed >> i & 1:
+                if live >> i & 1:
+                    moves.append(LETTERS[i])
+                elif not dead_seen:
+                    moves.append(LETTERS[i])
+                    dead_seen = True
+        return moves
+
+    def decided_outcome(self) -> Any:
+        """
+        Return WIN or LOSE if the leylines settle the game for the player to
+        move, and None otherwise: a finished game is a loss for the player to
+        move, and a game where one claim captures enough leylines to win is
+        a win.
+
+        Counting the leylines each player could still capture settles
+        nothing sooner: an open leyline has no more than half its cells
+        claimed by either player, so both can still capture it.
+        >>> StonehedgeState(True, 3).decided_outcome() is None
+        True
+        >>> state = StonehedgeState(True, 3)
+        >>> for move in "ACBFEGDI":
+        ...     state = state.make_move(move)
+        >>> state.decided_outcome()
+        1
+        """
+        if self.is_over():
+            return self.LOSE
+        topology = self._topology
+        counts = self._counts
+        captured = self._p1_leylines | self._p2_leylines
+        if self.p1_turn:
+            needed = topology.to_win - self._p1_captured
+            offset = 0
+        else:
+            needed = topology.to_win - self._p2_captured
+            offset = topology.num_leylines
+        claimed = self._p1_cells | self._p2_cells
+        for cell in range(topology.num_cells):
+            if not claimed >> cell & 1:
+                gained = 0
+                for i in topology.cell_leylines[cell]:
+                    if (not captured >> i & 1 and counts[offset + i] + 1
+                            >= topology.thresholds[i]):
+                        gained += 1
+                if gained >= needed:
+                    return self.WIN
+        return None
 
     def leyline_to_cell(self) -> dict:
         """
@@ -155,47 +600,9 @@ class StonehedgeState(GameState):
         'C'], 2: ['A', 'B'], 3: ['C'], 4: ['B'], 5: ['A', 'C']}
         True
         """
-        if self.size == 2:
-            d = {0: ["A", "C"], 1: ["B", "D", "F"], 2: ["A", "B"],
-                 3: ["E", "G"], 4: ["C", "D", "E"], 5: ["F", "G"],
-                 6: ["B", "E"], 7: ["C", "F"], 8: ["A", "D", "G"]}
-        elif self.size == 1:
-            d = {0: ["A"], 1: ["B", "C"], 2: ["A", "B"], 3: ["C"], 4: ["B"],
-                 5: ["A", "C"]}
-        elif self.size == 3:
-            d = {0: ["A", "C", "F"], 1: ["B", "D", "G", "J"], 2: ["A", "B"],
-                 3: ["E", "H", "K"], 4: ["C", "D", "E"], 5: ["L", "I"],
-                 6: ["F", "G", "H", "I"], 7: ["J", "K", "L"],
-                 8: ["B", "E", "I"], 9: ["F", "J"], 10: ["C", "G", "K"],
-                 11: ["A", "D", "H", "L"]}
-        elif self.size == 4:
-            d = {0: ["A", "C", "F", "J"], 1: ["B", "D", "G", "K", "O"],
-                 2: ["A", "B"], 3: ["P", "L", "H", "E"], 4: ["C", "D", "E"],
-                 5: ["Q", "M", "I"], 8: ['J', "K", "L", "M", "N"],
-                 6: ["F", "G", "H", "I"], 7: ["R", "N"],
-                 9: ["O", "P", "Q", "R"], 11: ["O", "J"], 12: ["F", "K", "P"],
-                 13: ["C", "G", "L", "Q"], 14: ["A", "D", "H", "M", "R"],
-                 10: ["B", "E", "I", "N"]}
-        elif self.size == 5:
-            d = {0: ["A", "C", "F", "J", "O"],
-                 1: ["B", "D", "G", "K", "P", "U"], 2: ["A", "B"],
-                 3: ["E", "H", "L", "Q", "V"], 4: ["C", "D", "E"],
-                 5: ["I", "M", "R", "W"], 6: ["F", "G", "H", "I"],
-                 7: ["N", "S", "X"], 8: ["J", "K", "L", "M", "N"],
-                 9: ["T", "Y"], 10: ["O", "P", "Q", "R", "S", "T"],
-                 12: ["T", "M", "H", "D", "A"], 11: ["U", "V", "X", "W", "Y"],
-                 13: ["U", "O"], 14: ["V", "P", "J"], 15: ["W", "Q", "K", "F"],
-                 16: ["X", "R", "L", "G", "C"],
-                 17: ["Y", "S", "M", "H", "D", "A"]}
-        c = self.cells[:]
-        ind = ["A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L",
-               "M", "N", "O", "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y"]
-        for v in range(len(ind)):
-            for x in range(len(d)):
-                for y in range(len(d[x])):
-                    if d[x][y] == ind[v]:
-                        d[x][y] = c[v]
-        return d
+        cells = self.cells
+        return {i: [cells[cell] for cell in line]
+                for i, line in enumerate(self._topology.leyline_cells)}
 
     def make_move(self, move: str) -> 'StonehedgeState':
         """
@@ -204,33 +611,205 @@ class StonehedgeState(GameState):
         1, [1, '@', 1, '@', '@', 2], [1, 'B', 'C']).__repr__()
         True
         """
-        leylines = self.leylines[:]
-        cells = self.cells[:]
-        c_ind = cells.index(move)
+        cell = self._free_cell(move)
+        state = self._copy()
+        state._claim(cell)
+        return state
+
+    def _free_cell(self, move: str) -> int:
+        """
+        Return the index of the cell move names, raising ValueError if it is
+        not an unclaimed cell of this board.
+        >>> StonehedgeState(True, 1).make_move("A").make_move("A")
+        Traceback (most recent call last):
+        ...
+        ValueError: 'A' is not an unclaimed cell
+        """
+        cell = _CELL_INDEX.get(move, self._topology.num_cells)
+        if (cell >= self._topology.num_cells
+                or (self._p1_cells | self._p2_cells) >> cell & 1):
+            raise ValueError("{!r} is not an unclaimed cell".format(move))
+        return cell
+
+    def apply(self, move: str) -> None:
+        """
+        Apply move to this state in place, remembering it so that undo() can
+        reverse it.
+        >>> state = StonehedgeState(True, 1)
+        >>> state.apply("A")
+        >>> repr(state) == repr(StonehedgeState(True, 1).make_move("A"))
+        True
+        """
+        cell = self._free_cell(move)
+        self._history.append((cell, self._p1_leylines, self._p2_leylines,
+                              self._p1_captured, self._p2_captured,
+                              self.zobrist))
+        self._claim(cell)
+        self._legal_moves = None
+
+    def undo(self) -> None:
+        """
+        Reverse the most recent apply() on this state.
+        >>> state = StonehedgeState(True, 1)
+        >>> state.apply("A")
+        >>> state.undo()
+        >>> repr(state) == repr(StonehedgeState(True, 1))
+        True
+        """
+        cell, self._p1_leylines, self._p2_leylines, self._p1_captured, \
+            self._p2_captured, self.zobrist = self._history.pop()
+        self.p1_turn = not self.p1_turn
+        self._legal_moves = None
+        topology = self._topology
         if self.p1_turn:
-            cells[c_ind] = 1
+            self._p1_cells &= ~(1 << cell)
+            offset = 0
         else:
-            cells[c_ind] = 2
-        player = not self.p1_turn
-        d = StonehedgeState(player, self.size, leylines,
-                            cells).leyline_to_cell()
-        for i in range(len(d)):
-            if len(list(d[i])) % 2 == 0:
-                num = len(list(d[i])) // 2
-            else:
-                num = (len(list(d[i])) + 1) // 2
-            cap_1 = 0
-            cap_2 = 0
-            for x in list(d[i]):
-                if x == 1:
-                    cap_1 += 1
-                elif x == 2:
-                    cap_2 += 1
-            if cap_1 >= num and not isinstance(leylines[i], int):
-                leylines[i] = 1
-            if cap_2 >= num and not isinstance(leylines[i], int):
-                leylines[i] = 2
-        return StonehedgeState(player, self.size, leylines, cells)
+            self._p2_cells &= ~(1 << cell)
+            offset = topology.num_leylines
+        for i in topology.cell_leylines[cell]:
+            self._counts[offset + i] -= 1
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return whether self and other are the same position with the same
+        player to move.
+        >>> state_1 = StonehedgeState(True, 2).make_move("A").make_move("G")
+        >>> state_2 = StonehedgeState(False, 2).make_move("G").make_move("A")
+        >>> state_1 == state_2
+        False
+        >>> state_1 == StonehedgeState(True, 2).make_move("A").make_move("G")
+        True
+        """
+        if not isinstance(other, StonehedgeState):
+            return NotImplemented
+        return (self.zobrist == other.zobrist
+                and self.p1_turn == other.p1_turn
+                and self.size == other.size
+                and self._p1_cells == other._p1_cells
+                and self._p2_cells == other._p2_cells
+                and self._p1_leylines == other._p1_leylines
+                and self._p2_leylines == other._p2_leylines)
+
+    def __hash__(self) -> int:
+        """
+        Return the Zobrist hash of this state, which make_move and apply keep
+        up to date as cells and leylines change hands.
+        >>> state_1 = StonehedgeState(True, 2).make_move("A").make_move("G")
+        >>> hash(state_1) == hash(StonehedgeState(True, 2, state_1.leylines,
+        ...                                       state_1.cells))
+        True
+        """
+        return self.zobrist
+
+    def move_priority(self, move: str) -> int:
+        """
+        Return the number of uncaptured leylines through the cell move.
+        >>> StonehedgeState(True, 1).make_move("A").move_priority("C")
+        2
+        """
+        captured = self._p1_leylines | self._p2_leylines
+        return sum(1 for i in self._topology.cell_leylines[_CELL_INDEX[move]]
+                   if not captured >> i & 1)
+
+    def key(self) -> int:
+        """
+        Return an int that packs this state's board size, turn and masks, for
+        use as a cache key.
+        >>> StonehedgeState(True, 1).key() == StonehedgeState(False, 1).key()
+        False
+        """
+        return (self._p1_cells | self._p2_cells << 25
+                | self._p1_leylines << 50 | self._p2_leylines << 68
+                | self.p1_turn << 86 | self.size << 87)
+
+    def _packed(self) -> int:
+        """
+        Return this state's cells and leylines as one int: p1's cells, then
+        p2's cells, then p1's leylines, then p2's leylines.
+        """
+        cells = self._topology.num_cells
+        leylines = self._topology.num_leylines
+        return (self._p1_cells | self._p2_cells << cells
+                | self._p1_leylines << 2 * cells
+                | self._p2_leylines << 2 * cells + leylines)
+
+    def _canonical_packed(self) -> int:
+        """
+        Return the smallest packed position this state can be mapped to by a
+        symmetry of the board.
+        """
+        best = packed = self._packed()
+        for byte_maps in self._topology.symmetry_maps[1:]:
+            image = 0
+            rest = packed
+            for chunk in byte_maps:
+                image |= chunk[rest & 255]
+                rest >>= 8
+            if image < best:
+                best = image
+        return best
+
+    def canonical_key(self) -> int:
+        """
+        Return an int that packs the smallest packed position this state can
+        be mapped to by a symmetry of the board, with the turn and board
+        size, so that mirror images of a position share a cache entry.
+        >>> state = StonehedgeState(True, 1)
+        >>> state.make_move("B").canonical_key() == \
+        state.make_move("C").canonical_key()
+        True
+        """
+        topology = self._topology
+        return (self._canonical_packed()
+                | (self.p1_turn | self.size << 1)
+                << 2 * (topology.num_cells + topology.num_leylines))
+
+    def canonical(self) -> 'StonehedgeState':
+        """
+        Return the position packed as in canonical_key(), with the same
+        player to move.
+        >>> StonehedgeState(True, 1).make_move("C").canonical().cells
+        ['A', 1, 'C']
+        """
+        packed = self._canonical_packed()
+        cells = self._topology.num_cells
+        leylines = self._topology.num_leylines
+        owners = [1 if packed >> i & 1 else 2 if packed >> cells + i & 1
+                  else '@' for i in range(cells)]
+        leyline_owners = [1 if packed >> 2 * cells + i & 1
+                          else 2 if packed >> 2 * cells + leylines + i & 1
+                          else '@' for i in range(leylines)]
+        return StonehedgeState(self.p1_turn, self.size, leyline_owners,
+                               owners)
+
+    def distinct_moves(self) -> list:
+        """
+        Return the moves of search_moves(), leaving out any move that a
+        symmetry fixing this position maps to an earlier move.
+        >>> StonehedgeState(True, 2).distinct_moves()
+        ['A', 'D']
+        >>> StonehedgeState(True, 2).make_move("D").distinct_moves()
+        ['A']
+        """
+        moves = self.search_moves()
+        symmetries = self._topology.symmetries
+        if len(moves) < 2 or len(symmetries) == 1:
+            return moves
+        packed = self._packed()
+        stabilizer = [symmetries[i][0] for i in range(1, len(symmetries))
+                      if _map_mask(packed,
+                                   self._topology.symmetry_maps[i]) == packed]
+        if stabilizer == []:
+            return moves
+        distinct = []
+        seen = set()
+        for move in moves:
+            cell = _CELL_INDEX[move]
+            if cell not in seen:
+                distinct.append(move)
+                seen.update(cells[cell] for cells in stabilizer)
+        return distinct
 
     def __repr__(self) -> Any:
         """
@@ -258,8 +837,9 @@ class StonehedgeState(GameState):
         if self.is_over():
             return self.LOSE
         for move in moves:
-            resulting_states.append(self.make_move(move))
-            if self.make_move(move).is_over():
+            new_state = self.make_move(move)
+            resulting_states.append(new_state)
+            if new_state.is_over():
                 return self.WIN
         for item in resulting_states:
             moves_step = item.get_possible_moves()[:]
@@ -274,16 +854,25 @@ class StonehedgeState(GameState):
         >>> StonehedgeState(False, 1).is_over()
         False
         """
-        capture = len(self.leylines)
-        capture = capture + 1 if capture % 2 != 0 else capture
-        num_1 = 0
-        num_2 = 0
-        for x in self.leylines:
-            if x == 1:
-                num_1 += 1
-            elif x == 2:
-                num_2 += 1
-        return ((2 * num_1) >= capture) or ((2 * num_2) >= capture)
+        to_win = self._topology.to_win
+        return self._p1_captured >= to_win or self._p2_captured >= to_win
+
+
+def _state_from_key(key: int) -> StonehedgeState:
+    """
+    Return the state whose key() is key.
+    >>> state = StonehedgeState(False, 3).make_move("E")
+    >>> _state_from_key(state.key()) == state
+    True
+    """
+    state = StonehedgeState.__new__(StonehedgeState)
+    state.p1_turn = bool(key >> 86 & 1)
+    state._legal_moves = None
+    state.size = key >> 87
+    state._topology = get_topology(state.size)
+    state._set_masks(key & 0x1ffffff, key >> 25 & 0x1ffffff,
+                     key >> 50 & 0x3ffff, key >> 68 & 0x3ffff)
+    return state
 
 
 class StonehedgeGame(Game):
@@ -313,17 +902,7 @@ class StonehedgeGame(Game):
         """
         Return whether or not this game is over at state.
         """
-        capture = len(state.leylines)
-        capture = capture + 1 if capture % 2 != 0 else capture
-        capture //= 2
-        num_1 = 0
-        num_2 = 0
-        for x in state.leylines:
-            if x == 1:
-                num_1 += 1
-            elif x == 2:
-                num_2 += 1
-        return num_1 >= capture or num_2 >= capture
+        return state.is_over()
 
     def is_winner(self, player: str) -> bool:
         """
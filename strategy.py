@@ -6,7 +6,9 @@ Adjust the type annotations as needed, and implement both a recursive
 and an iterative version of minimax.
 """
 from typing import Any
-from minimax_iterative import iterative_outcome_tr
+from alphabeta import alphabeta_outcome, NEG_INF
+from minimax_iterative import SearchFrame, iterative_outcome_lean
+from transposition import TranspositionTable
 
 
 def interactive_strategy(game: Any) -> Any:
@@ -42,7 +44,7 @@ def rough_outcome_strategy(game: Any) -> Any:
     best_outcome = -2 # Temporarily -- just so we can replace this easily later
 
     # Get the move that results in the lowest rough_outcome for the opponent
-    for move in current_state.get_possible_moves():
+    for move in current_state.legal_moves:
         new_state = current_state.make_move(move)
 
         # We multiply the below by -1 since a state that's bad for the opponent
@@ -60,15 +62,14 @@ def _game_is_winner(current_state: Any, player) -> bool:
     """
     Return whether game has winner
     """
-    return (current_state.get_current_player_name() != player
-            and _game_is_over(current_state))
+    return current_state.winner == player
 
 
 def _game_is_over(current_state: Any) -> bool:
     """
     Return whether game is over.
     """
-    return current_state.get_possible_moves() == []
+    return current_state.is_terminal
 
 
 def minimax_recursive(game: Any) -> Any:
@@ -79,7 +80,7 @@ def minimax_recursive(game: Any) -> Any:
     best_move = None
     best_outcome = -2
 
-    for move in current_state.get_possible_moves():
+    for move in current_state.distinct_moves():
         new_state = current_state.make_move(move)
 
         guessed_score = _recursive_outcome(new_state) * -1
@@ -106,9 +107,17 @@ def _recursive_outcome(current_state: Any, depth=None) -> int:
         return 1 if depth % 2 == 1 else -1
     state = current_state
     outcomes = []
-    moves = state.get_possible_moves()
+    moves = state.legal_moves
     for move in moves:
-        outcomes.append(_recursive_outcome(state.make_move(move), depth + 1))
+        # Walk the tree on this one state when it can undo its moves, since
+        # building a new state for every node is most of the cost.
+        if state.supports_apply:
+            state.apply(move)
+            outcomes.append(_recursive_outcome(state, depth + 1))
+            state.undo()
+        else:
+            outcomes.append(_recursive_outcome(state.make_move(move),
+                                               depth + 1))
     if depth % 2 == 1:
         return min(outcomes)
     return max(outcomes)
@@ -122,9 +131,9 @@ def minimax_iterative(game: Any) -> Any:
     best_move = None
     best_outcome = -2
 
-    for move in current_state.get_possible_moves():
+    for move in current_state.distinct_moves():
         new_state = current_state.make_move(move)
-        guessed_score = iterative_outcome_tr(new_state) * -1
+        guessed_score = iterative_outcome_lean(new_state) * -1
         if guessed_score > best_outcome:
             best_outcome = guessed_score
             best_move = move
@@ -132,6 +141,127 @@ def minimax_iterative(game: Any) -> Any:
     return best_move
 
 
+def minimax_alphabeta(game: Any) -> Any:
+    """
+    Return a move for game using minimax with alpha-beta pruning.
+
+    This picks the same move as minimax_recursive: the first move with the
+    best score. Each later move is only searched far enough to show whether
+    it beats the best score so far, and the search stops at the first move
+    that wins.
+    """
+    current_state = game.current_state
+    best_move = None
+    best_outcome = NEG_INF
+
+    for move in current_state.distinct_moves():
+        new_state = current_state.make_move(move)
+        guessed_score = alphabeta_outcome(new_state, NEG_INF,
+                                          -best_outcome) * -1
+        if guessed_score > best_outcome:
+            best_outcome = guessed_score
+            best_move = move
+            if best_outcome == current_state.WIN:
+                break
+    return best_move
+
+
+class MemoizedMinimax:
+    """
+    A minimax strategy that remembers the score of every position it solves
+    in a transposition table, so that a position reached through different
+    move orders, or a mirror image of it, is only searched once. The table
+    is kept between moves.
+
+    table - the solved positions, mapping the name of each state's class
+            with its canonical key to its score, so that the keys of
+            different games never clash
+    """
+    table: TranspositionTable
+
+    def __init__(self, max_entries: int = 1000000) -> None:
+        """
+        Initialize this strategy with a table of at most max_entries
+        positions.
+        """
+        self.table = TranspositionTable(max_entries)
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return a move for game.
+        """
+        current_state = game.current_state
+        best_move = None
+        best_outcome = -2
+
+        for move in current_state.distinct_moves():
+            new_state = current_state.make_move(move)
+            guessed_score = self.outcome(new_state) * -1
+            if guessed_score > best_outcome:
+                best_outcome = guessed_score
+                best_move = move
+        return best_move
+
+    def outcome(self, state: Any) -> int:
+        """
+        Return the minimax score of state for its current player. state is
+        left as it was, though it may be changed and restored along the way.
+
+        The search keeps its own stack of the positions on the current path
+        rather than recursing, so a deep game such as a large SubtractSquare
+        total does not run out of Python's call stack.
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> MemoizedMinimax().outcome(SubtractSquareState(True, 5000))
+        1
+        """
+        score, entry = self._enter(state)
+        if entry is None:
+            return score
+        path = [entry]
+        while path:
+            frame, key = path[-1]
+            if score is not None:
+                if frame.state.supports_apply:
+                    frame.state.undo()
+                frame.best = max(frame.best, score * -1)
+            move = next(frame.moves, None)
+            if move is None:
+                score = frame.best
+                self.table.store(key, score)
+                path.pop()
+                continue
+            if frame.state.supports_apply:
+                frame.state.apply(move)
+                child = frame.state
+            else:
+                child = frame.state.make_move(move)
+            score, entry = self._enter(child)
+            if entry is not None:
+                path.append(entry)
+        return score
+
+    def _enter(self, state: Any) -> tuple:
+        """
+        Return (score, None) if the score of state is in the table or
+        settled without searching, and otherwise (None, (frame, key)): a
+        SearchFrame for searching state and its canonical key.
+        """
+        key = (type(state).__name__, state.canonical_key())
+        score = self.table.get(key)
+        if score is None:
+            score = state.decided_outcome()
+        if score is not None:
+            return score, None
+        moves = state.search_moves()
+        if moves == []:
+            return state.LOSE, None
+        return None, (SearchFrame(state, moves), key)
+
+
+minimax_memoized = MemoizedMinimax()
+
+
 if __name__ == "__main__":
     from python_ta import check_all
 
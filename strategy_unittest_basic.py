@@ -0,0 +1,637 @@
+"""
+Unittests for the search strategies beyond the recursive and iterative
+minimax strategies. They replay the positions from minimax_unittest_basic.py
+and check that each strategy finds a winning move.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from game_interface import playable_games
+from alphabeta import alphabeta_outcome
+from arena import ArenaSearch, StateArena
+from grundy import GrundySolver, SpragueGrundyStrategy
+from iterative_deepening import IterativeDeepening
+from mcts import MonteCarloTreeSearch, RootParallelMCTS
+from move_ordering import MoveOrderer
+from parallel import ParallelMinimax, YoungBrothersWait
+from proof_number import ProofNumberSearch
+from stonehedge import StonehedgeState
+from square_table import SquareTable, SquareTableStrategy
+from shared_table import SharedTranspositionTable, shared_table_outcome
+from transposition import TranspositionTable
+from tablebase import Tablebase, TablebaseStrategy, generate, table_path
+from subtraction_state import SubtractionState
+from subtract_square_state import (MultiSubtractSquareState,
+                                   SubtractSquareState, squares)
+from strategy import MemoizedMinimax, minimax_alphabeta, minimax_recursive
+StonehengeGame = playable_games['h']
+SubtractSquareGame = playable_games['s']
+MultiSubtractSquareGame = playable_games['m']
+
+
+def subtract_square_game(total):
+    """
+    Return a game of SubtractSquare starting from total.
+    """
+    with patch('builtins.input', return_value=str(total)):
+        return SubtractSquareGame(True)
+
+
+def stonehenge_game(size, moves):
+    """
+    Return a game of Stonehenge of side length size after moves are made.
+    """
+    with patch('builtins.input', return_value=str(size)):
+        game = StonehengeGame(True)
+    for move in moves:
+        game.current_state = game.current_state.make_move(
+            game.str_to_move(move))
+    return game
+
+
+class MemoizedMinimaxUnitTests(unittest.TestCase):
+    def test_subtract_square_18(self):
+        """
+        Test that the memoized strategy picks 1 or 16 from 18, and that the
+        repeated totals it meets are answered from its table.
+        """
+        strategy = MemoizedMinimax()
+        move_chosen = strategy(subtract_square_game(18))
+        self.assertIn(move_chosen, [1, 16])
+        self.assertGreater(strategy.table.hits, 0)
+
+    def test_stonehenge_one_winning_move_not_immediate(self):
+        """
+        Test that the memoized strategy finds the only winning move, E.
+        """
+        game = stonehenge_game(2, ['A', 'F', 'D'])
+        self.assertEqual(MemoizedMinimax()(game), 'E')
+
+    def test_games_do_not_share_entries(self):
+        """
+        Test that a SubtractSquare score is not served for a Stonehedge
+        position whose canonical key is the same int.
+        """
+        strategy = MemoizedMinimax()
+        square = SubtractSquareState(False, 262144)
+        stonehedge = StonehedgeState(False, 1)
+        self.assertEqual(square.key(), stonehedge.canonical_key())
+        strategy.table.store(('SubtractSquareState', square.key()),
+                             square.LOSE)
+        self.assertEqual(strategy.outcome(stonehedge),
+                         alphabeta_outcome(stonehedge))
+
+    def test_table_is_bounded(self):
+        """
+        Test that the table never holds more entries than its cap.
+        """
+        strategy = MemoizedMinimax(max_entries=5)
+        move_chosen = strategy(stonehenge_game(2, []))
+        expected_move = MemoizedMinimax()(stonehenge_game(2, []))
+        self.assertEqual(move_chosen, expected_move)
+        self.assertLessEqual(len(strategy.table), 5)
+        self.assertGreater(strategy.table.evictions, 0)
+
+
+class SymmetryUnitTests(unittest.TestCase):
+    def test_symmetries_map_leylines(self):
+        """
+        Test that every symmetry maps each leyline's cells onto the cells
+        of the leyline it is paired with.
+        """
+        for size in range(1, 6):
+            state = stonehenge_game(size, []).current_state
+            topology = state._topology
+            for cells, leylines in topology.symmetries:
+                for line, image in zip(topology.leyline_cells, leylines):
+                    self.assertEqual({cells[cell] for cell in line},
+                                     set(topology.leyline_cells[image]))
+
+    def test_mirror_images_share_entries(self):
+        """
+        Test that mirror images of a position have one canonical key and
+        solve to the same score, and that a symmetric position offers only
+        one move per class.
+        """
+        for size, first, mirror in [(2, 'A', 'G'), (3, 'A', 'F')]:
+            state = stonehenge_game(size, [first]).current_state
+            image = stonehenge_game(size, [mirror]).current_state
+            self.assertEqual(state.canonical_key(), image.canonical_key())
+            self.assertEqual(state.canonical().key(), image.canonical().key())
+            self.assertEqual(alphabeta_outcome(state),
+                             alphabeta_outcome(image))
+        state = stonehenge_game(2, []).current_state
+        self.assertEqual(state.distinct_moves(), ['A', 'D'])
+
+
+class StonehedgeMoveUnitTests(unittest.TestCase):
+    def test_invalid_moves_raise(self):
+        """
+        Test that claiming a claimed cell, or a cell off the board, raises
+        ValueError from make_move and apply and leaves the state alone.
+        """
+        state = stonehenge_game(2, ['A']).current_state
+        for move in ['A', 'H', 'Z']:
+            self.assertRaises(ValueError, state.make_move, move)
+            self.assertRaises(ValueError, state.apply, move)
+        self.assertEqual(state, stonehenge_game(2, ['A']).current_state)
+        self.assertEqual(state.get_possible_moves(), list('BCDEFG'))
+
+
+class DeadCellUnitTests(unittest.TestCase):
+    def test_dead_cells_collapse(self):
+        """
+        Test that dead cells are offered as one move, and that claiming any
+        of them gives the same score.
+        """
+        state = stonehenge_game(3, list('FHKDCIBJ')).current_state
+        self.assertEqual(state.dead_cells(), ['A', 'G'])
+        self.assertEqual(state.search_moves(), ['A', 'E', 'L'])
+        self.assertEqual(alphabeta_outcome(state.make_move('A')),
+                         alphabeta_outcome(state.make_move('G')))
+
+    def test_decided_outcome(self):
+        """
+        Test that a position is decided as a win exactly when one claim
+        ends the game, and as a loss once it is over.
+        """
+        state = stonehenge_game(3, []).current_state
+        for move in 'ACBFEGDIH':
+            wins_now = any(state.make_move(reply).is_over()
+                           for reply in state.get_possible_moves())
+            self.assertEqual(state.decided_outcome(),
+                             state.WIN if wins_now else None)
+            state = state.make_move(move)
+        self.assertEqual(state.decided_outcome(), state.LOSE)
+
+
+class AlphaBetaUnitTests(unittest.TestCase):
+    def test_subtract_square_18(self):
+        """
+        Test that alpha-beta picks 1 or 16 from 18.
+        """
+        self.assertIn(minimax_alphabeta(subtract_square_game(18)), [1, 16])
+
+    def test_stonehenge_one_winning_move(self):
+        """
+        Test that alpha-beta finds H or K on the size 3 board from
+        minimax_unittest_basic.py.
+        """
+        game = stonehenge_game(3, ['A', 'C', 'B', 'F', 'E', 'G', 'D', 'I'])
+        self.assertIn(minimax_alphabeta(game), ['H', 'K'])
+
+    def test_same_moves_as_minimax_recursive(self):
+        """
+        Test that alpha-beta picks the same move as minimax_recursive.
+        """
+        for moves in [[], ['A'], ['B', 'G'], ['A', 'F', 'D']]:
+            game = stonehenge_game(2, moves)
+            self.assertEqual(minimax_alphabeta(game),
+                             minimax_recursive(game))
+        for total in range(1, 20):
+            game = subtract_square_game(total)
+            self.assertEqual(minimax_alphabeta(game),
+                             minimax_recursive(game))
+
+    def test_move_ordering_keeps_scores(self):
+        """
+        Test that ordering moves changes how alpha-beta searches, not the
+        scores it finds.
+        """
+        orderer = MoveOrderer(TranspositionTable(1000))
+        for moves in [[], ['A'], ['B', 'G'], ['A', 'F', 'D']]:
+            state = stonehenge_game(2, moves).current_state
+            self.assertEqual(alphabeta_outcome(state, orderer=orderer),
+                             alphabeta_outcome(state))
+
+
+class IterativeDeepeningUnitTests(unittest.TestCase):
+    def test_stonehenge_one_winning_move_not_immediate(self):
+        """
+        Test that iterative deepening finds the only winning move, E.
+        """
+        game = stonehenge_game(2, ['A', 'F', 'D'])
+        self.assertEqual(IterativeDeepening(time_budget=5)(game), 'E')
+
+    def test_stonehenge_time_budget(self):
+        """
+        Test that iterative deepening answers on an empty size 5 board
+        within its time budget, with a move from a finished search.
+        """
+        game = stonehenge_game(5, [])
+        strategy = IterativeDeepening(time_budget=0.2)
+        start = time.monotonic()
+        move_chosen = strategy(game)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertIn(move_chosen, game.current_state.get_possible_moves())
+        self.assertGreaterEqual(strategy.depth_reached, 1)
+
+    def test_guessed_win_does_not_stop_deepening(self):
+        """
+        Test that a win guessed by rough_outcome() at the depth limit does
+        not end the search, so a proven win is played.
+        """
+        state = StonehedgeState(True, 3, [2, '@', 2, '@', '@', 1, 1, '@', '@',
+                                          1, '@', '@'],
+                                [2, 'B', 2, 'D', 'E', 1, 1, 'H', 'I', 2, 'K',
+                                 1])
+        game = stonehenge_game(3, [])
+        game.current_state = state
+        self.assertEqual(alphabeta_outcome(state), state.WIN)
+        strategy = IterativeDeepening(time_budget=5)
+        move_chosen = strategy(game)
+        self.assertEqual(alphabeta_outcome(state.make_move(move_chosen)),
+                         state.LOSE)
+        self.assertGreater(strategy.depth_reached, 1)
+
+    def test_max_depth(self):
+        """
+        Test that iterative deepening stops at max_depth.
+        """
+        strategy = IterativeDeepening(time_budget=5, max_depth=2)
+        strategy(stonehenge_game(4, []))
+        self.assertEqual(strategy.depth_reached, 2)
+
+
+class ParallelMinimaxUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.table = SharedTranspositionTable(4096)
+        self.strategies = [ParallelMinimax(workers=2),
+                           ParallelMinimax(workers=2, split_depth=2),
+                           ParallelMinimax(workers=2, table=self.table),
+                           YoungBrothersWait(workers=2),
+                           YoungBrothersWait(workers=2, split_depth=1),
+                           YoungBrothersWait(workers=2, table=self.table)]
+
+    def tearDown(self):
+        for strategy in self.strategies:
+            strategy.close()
+        self.table.close()
+
+    def test_same_moves_as_minimax_recursive(self):
+        """
+        Test that the parallel strategies, splitting the tree at the root
+        or one ply further down, give the same move as minimax_recursive.
+        """
+        games = [subtract_square_game(18), subtract_square_game(4),
+                 stonehenge_game(2, ['A', 'F', 'D']),
+                 stonehenge_game(3, ['A', 'C', 'B', 'F', 'E', 'G', 'D', 'I'])]
+        for game in games:
+            for strategy in self.strategies:
+                self.assertEqual(strategy(game), minimax_recursive(game))
+
+    def test_workers_fill_shared_table(self):
+        """
+        Test that the workers' results reach the shared table, so the
+        position they solved can be read back from this process.
+        """
+        game = stonehenge_game(2, ['A', 'F'])
+        self.strategies[2](game)
+        state = game.current_state.make_move('B')
+        entry = self.table.lookup(SharedTranspositionTable.key_of(state))
+        self.assertIsNotNone(entry)
+
+    def test_distinct_keys_do_not_share_entries(self):
+        """
+        Test that two positions whose key() hashes clash in Python's hash()
+        get their own entries and their own scores.
+        """
+        state = StonehedgeState(True, 3, ['@', '@', 1, '@', '@', 1, '@', 2,
+                                          1, 2, '@', '@'],
+                                ['A', 'B', 'C', 'D', 1, 2, 'G', 'H', 1, 2, 2,
+                                 1])
+        first, second = state.make_move('A'), state.make_move('B')
+        self.assertEqual(shared_table_outcome(first, -2, 2, self.table), -1)
+        self.assertEqual(shared_table_outcome(second, -2, 2, self.table), 1)
+
+
+class MonteCarloTreeSearchUnitTests(unittest.TestCase):
+    def test_subtract_square_18(self):
+        """
+        Test that MCTS picks 1 or 16 from 18.
+        """
+        strategy = MonteCarloTreeSearch(playouts=2000, seed=0)
+        self.assertIn(strategy(subtract_square_game(18)), [1, 16])
+
+    def test_stonehenge_one_winning_move(self):
+        """
+        Test that MCTS takes a move that wins at once on the size 3 board
+        from minimax_unittest_basic.py.
+        """
+        game = stonehenge_game(3, ['A', 'C', 'B', 'F', 'E', 'G', 'D', 'I'])
+        strategy = MonteCarloTreeSearch(playouts=100, seed=0)
+        self.assertIn(strategy(game), ['H', 'K'])
+
+    def test_stonehenge_one_winning_move_not_immediate(self):
+        """
+        Test that MCTS finds the only winning move, E.
+        """
+        game = stonehenge_game(2, ['A', 'F', 'D'])
+        strategy = MonteCarloTreeSearch(playouts=2000, seed=0)
+        self.assertEqual(strategy(game), 'E')
+
+    def test_playout_budget(self):
+        """
+        Test that MCTS runs exactly its playout budget.
+        """
+        strategy = MonteCarloTreeSearch(playouts=300, seed=0)
+        strategy(stonehenge_game(3, []))
+        self.assertEqual(strategy.playouts_run, 300)
+
+    def test_reuses_subtree(self):
+        """
+        Test that after a move and a reply, the search continues from the
+        subtree it had already grown under them.
+        """
+        game = stonehenge_game(3, [])
+        strategy = MonteCarloTreeSearch(playouts=2000, seed=0)
+        move = strategy(game)
+        reply = [m for m in game.current_state.get_possible_moves()
+                 if m != move][0]
+        game.current_state = game.current_state.make_move(move)
+        game.current_state = game.current_state.make_move(reply)
+        root = strategy.search(game.current_state)
+        self.assertGreater(root.visits, strategy.playouts_run)
+
+
+class RootParallelMCTSUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.strategies = [RootParallelMCTS(workers=2, playouts=2000, seed=0),
+                           RootParallelMCTS(workers=2, playouts=2000, seed=0)]
+
+    def tearDown(self):
+        for strategy in self.strategies:
+            strategy.close()
+
+    def test_stonehenge_one_winning_move_not_immediate(self):
+        """
+        Test that root-parallel MCTS finds the only winning move, E, after
+        running the whole playout budget across its workers.
+        """
+        game = stonehenge_game(2, ['A', 'F', 'D'])
+        self.assertEqual(self.strategies[0](game), 'E')
+        self.assertEqual(self.strategies[0].playouts_run, 2000)
+
+    def test_same_seed_same_statistics(self):
+        """
+        Test that two searches with the same seed merge to the same
+        statistics.
+        """
+        game = stonehenge_game(3, ['A'])
+        for strategy in self.strategies:
+            strategy(game)
+        self.assertEqual(self.strategies[0].statistics,
+                         self.strategies[1].statistics)
+
+
+class ProofNumberSearchUnitTests(unittest.TestCase):
+    def test_stonehenge_proves_alphabeta_outcome(self):
+        """
+        Test that proof-number search proves the same outcome as alpha-beta,
+        and that its winning move leaves the opponent lost.
+        """
+        for moves in [[], ['A'], ['A', 'C', 'B', 'F', 'E', 'G', 'D', 'I']]:
+            state = stonehenge_game(3, moves).current_state
+            outcome, move = ProofNumberSearch().solve(state)
+            self.assertEqual(outcome, alphabeta_outcome(state))
+            if outcome == state.WIN:
+                self.assertEqual(alphabeta_outcome(state.make_move(move)),
+                                 state.LOSE)
+            else:
+                self.assertIsNone(move)
+
+    def test_node_limit(self):
+        """
+        Test that a search which runs out of nodes reports no outcome and
+        leaves the state as it was.
+        """
+        solver = ProofNumberSearch(max_nodes=50)
+        state = stonehenge_game(3, []).current_state
+        self.assertEqual(solver.solve(state), (None, None))
+        self.assertEqual(solver.nodes, 51)
+        self.assertEqual(state, stonehenge_game(3, []).current_state)
+        self.assertEqual(len(state.get_possible_moves()), 12)
+
+    def test_memory_limit(self):
+        """
+        Test that the table never holds more than its limit, and that the
+        search still proves the outcome.
+        """
+        solver = ProofNumberSearch(max_entries=1000)
+        game = stonehenge_game(3, ['A'])
+        self.assertEqual(solver.solve(game.current_state)[0], -1)
+        self.assertLessEqual(len(solver.table), 1000)
+        self.assertIn(solver(game), game.current_state.get_possible_moves())
+
+
+class TablebaseUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.strategy = TablebaseStrategy(self.directory.name)
+
+    def tearDown(self):
+        self.strategy.close()
+        self.directory.cleanup()
+
+    def test_lookup_matches_alphabeta(self):
+        """
+        Test that the size 2 tablebase agrees with alpha-beta along a game.
+        """
+        table = self.strategy.table(2)
+        game = stonehenge_game(2, [])
+        for move in ['A', 'F', 'D', 'E']:
+            state = game.current_state
+            outcome, best = table.lookup(state)
+            self.assertEqual(outcome, alphabeta_outcome(state))
+            if outcome == state.WIN:
+                self.assertEqual(alphabeta_outcome(state.make_move(best)),
+                                 state.LOSE)
+            game.current_state = state.make_move(move)
+
+    def test_stonehenge_one_winning_move(self):
+        """
+        Test that the size 3 tablebase plays a winning move.
+        """
+        game = stonehenge_game(3, ['A', 'C', 'B', 'F', 'E', 'G', 'D', 'I'])
+        self.assertIn(self.strategy(game), ['H', 'K'])
+
+    def test_resume(self):
+        """
+        Test that generation stopped partway carries on to the same file.
+        """
+        path = os.path.join(self.directory.name, "partial.tb")
+        self.assertFalse(generate(2, path, layers=3))
+        with self.assertRaises(ValueError):
+            Tablebase(path)
+        self.assertTrue(generate(2, path))
+        self.strategy.table(2)
+        with open(path, "rb") as partial, \
+                open(table_path(self.directory.name, 2), "rb") as whole:
+            self.assertEqual(partial.read(), whole.read())
+
+    def test_other_games(self):
+        """
+        Test that the strategy falls back on search for SubtractSquare.
+        """
+        self.assertEqual(self.strategy(subtract_square_game(4)), 4)
+
+
+class SquareTableUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "squares.npy")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_matches_minimax(self):
+        """
+        Test that the table agrees with minimax on small totals.
+        """
+        table = SquareTable.build(60, self.path)
+        for total in range(1, 30):
+            game = subtract_square_game(total)
+            state = game.current_state
+            won = MemoizedMinimax().outcome(state) == state.WIN
+            self.assertEqual(table.is_losing(total), not won)
+            if won:
+                move = table.best_move(total)
+                self.assertTrue(table.is_losing(total - move))
+
+    def test_subtract_square_18(self):
+        """
+        Test that the strategy plays 1 or 16 from 18, and builds a table at
+        least as big as the game when its limit is too small.
+        """
+        strategy = SquareTableStrategy(limit=10, path=self.path)
+        self.assertIn(strategy(subtract_square_game(18)), [1, 16])
+        self.assertGreaterEqual(strategy.table.limit, 18)
+        self.assertEqual(SquareTableStrategy(path=self.path)(
+            subtract_square_game(4)), 4)
+
+    def test_other_games(self):
+        """
+        Test that the strategy leaves games other than SubtractSquare to
+        minimax_alphabeta, without building a table.
+        """
+        strategy = SquareTableStrategy(path=self.path)
+        game = stonehenge_game(2, ['A', 'F', 'D'])
+        self.assertEqual(strategy(game), minimax_alphabeta(game))
+        with patch('builtins.input', return_value='3 4'):
+            game = MultiSubtractSquareGame(True)
+        self.assertEqual(strategy(game), minimax_alphabeta(game))
+        self.assertIsNone(strategy.table)
+
+
+class GrundySolverUnitTests(unittest.TestCase):
+    def test_matches_minimax(self):
+        """
+        Test that the solver agrees with minimax on a finite subtraction set,
+        and finds its period.
+        """
+        solver = GrundySolver([1, 4, 5])
+        for total in range(40):
+            state = SubtractionState(True, total, [1, 4, 5])
+            self.assertEqual(solver.outcome(state),
+                             MemoizedMinimax().outcome(state))
+        self.assertEqual(solver.period, 8)
+
+    def test_huge_total(self):
+        """
+        Test that a period answers for a total far beyond the values
+        worked out, and that the solver plays from it.
+        """
+        solver = GrundySolver([1, 4, 5])
+        state = SubtractionState(True, 10 ** 50 + 2, [1, 4, 5])
+        self.assertEqual(solver.outcome(state), state.LOSE)
+        self.assertEqual(solver.best_move(state.make_move(1)), 1)
+
+    def test_subtract_square_18(self):
+        """
+        Test that the solver plays SubtractSquare from its squares.
+        """
+        self.assertIn(GrundySolver(squares)(subtract_square_game(18)), [1, 16])
+
+
+class SpragueGrundyUnitTests(unittest.TestCase):
+    def test_matches_minimax(self):
+        """
+        Test that a nim-sum of 0 is exactly a lost position, and that the
+        strategy's move from a won position leaves a lost one.
+        """
+        strategy = SpragueGrundyStrategy()
+        with patch('builtins.input', return_value='0'):
+            game = MultiSubtractSquareGame(True)
+        for totals in [[2, 3], [5, 7], [4, 6, 9], [1, 2, 3, 10]]:
+            state = MultiSubtractSquareState(True, totals)
+            won = MemoizedMinimax().outcome(state) == state.WIN
+            self.assertEqual(strategy.nim_sum(state) != 0, won)
+            if won:
+                game.current_state = state
+                move = strategy(game)
+                self.assertEqual(MemoizedMinimax().outcome(
+                    state.make_move(move)), state.LOSE)
+
+    def test_game(self):
+        """
+        Test that the game reads its totals and moves, and ends when every
+        total is 0.
+        """
+        with patch('builtins.input', return_value='3 4'):
+            game = MultiSubtractSquareGame(True)
+        self.assertEqual(game.current_state.totals, [3, 4])
+        self.assertEqual(game.str_to_move("1 4"), (1, 4))
+        game.current_state = game.current_state.make_move((1, 4))
+        self.assertFalse(game.is_over(game.current_state))
+        self.assertEqual(SpragueGrundyStrategy()(game), (0, 1))
+
+    def test_other_games(self):
+        """
+        Test that single-total subtraction games are played from their
+        Grundy values, and other games are left to minimax_alphabeta.
+        """
+        strategy = SpragueGrundyStrategy()
+        self.assertIn(strategy(subtract_square_game(18)), [1, 16])
+        game = subtract_square_game(10)
+        game.current_state = SubtractionState(True, 10, [1, 2])
+        self.assertEqual(strategy(game), 1)
+        game = stonehenge_game(2, ['A', 'F', 'D'])
+        self.assertEqual(strategy(game), minimax_alphabeta(game))
+
+
+class ArenaSearchUnitTests(unittest.TestCase):
+    def test_same_scores_as_alphabeta(self):
+        """
+        Test that searching on an arena scores positions as alpha-beta does,
+        and leaves the position it was given in its slot.
+        """
+        for size, moves in [(1, []), (2, []), (2, ['B', 'G']),
+                            (3, ['A', 'C', 'B', 'F', 'E', 'G', 'D', 'I']),
+                            (3, ['F', 'H', 'K', 'D', 'C', 'I', 'B', 'J']),
+                            (4, list('ABCDEFGHIJKL'))]:
+            state = stonehenge_game(size, moves).current_state
+            arena = StateArena(size)
+            arena.load(state)
+            self.assertEqual(arena.outcome(), alphabeta_outcome(state))
+            self.assertEqual(arena.state(), state)
+
+    def test_same_moves_as_alphabeta(self):
+        """
+        Test that the strategy picks the same move as minimax_alphabeta,
+        including for SubtractSquare, which it leaves to minimax_alphabeta.
+        """
+        strategy = ArenaSearch()
+        for moves in [[], ['A'], ['B', 'G'], ['A', 'F', 'D']]:
+            game = stonehenge_game(2, moves)
+            self.assertEqual(strategy(game), minimax_alphabeta(game))
+        game = stonehenge_game(3, ['A', 'C', 'B', 'F', 'E', 'G', 'D', 'I'])
+        self.assertIn(strategy(game), ['H', 'K'])
+        self.assertIn(strategy(subtract_square_game(18)), [1, 16])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,8 @@ An implementation of Subtract Square.
 NOTE: You do not have to run python-ta on this file.
 """
 from game import Game
-from subtract_square_state import SubtractSquareState
+from subtract_square_state import SubtractSquareState, \
+    MultiSubtractSquareState
 
 
 class SubtractSquareGame(Game):
@@ -73,6 +74,63 @@ class SubtractSquareGame(Game):
         return int(string.strip())
 
 
+class MultiSubtractSquareGame(SubtractSquareGame):
+    """
+    SubtractSquare played on several totals at once.
+    """
+
+    def __init__(self, p1_starts):
+        """
+        Initialize this Game, using p1_starts to find who the first player is.
+
+        :param p1_starts: A boolean representing whether Player 1 is the first
+                          to make a move.
+        :type p1_starts: bool
+        """
+        counts = input("Enter the numbers to subtract from, separated by "
+                       "spaces: ")
+        self.current_state = MultiSubtractSquareState(
+            p1_starts, [int(count) for count in counts.split()])
+
+    def get_instructions(self):
+        """
+        Return the instructions for this Game.
+
+        :return: The instructions for this Game.
+        :rtype: str
+        """
+        instructions = "Players take turns subtracting a square number from" \
+            " one of the numbers, entered as the number's position (from 0)" \
+            " and the square. The winner is the person who makes the last" \
+            " subtraction."
+        return instructions
+
+    def is_over(self, state):
+        """
+        Return whether or not this game is over.
+
+        :return: True if the game is over, False otherwise.
+        :rtype: bool
+        """
+        return all(total == 0 for total in state.totals)
+
+    def str_to_move(self, string):
+        """
+        Return the move that string represents. If string is not a move,
+        return an invalid move.
+
+        :param string:
+        :type string:
+        :return:
+        :rtype:
+        """
+        parts = string.split()
+        if len(parts) != 2 or not all(part.isdigit() for part in parts):
+            return -1
+
+        return int(parts[0]), int(parts[1])
+
+
 if __name__ == "__main__":
     from python_ta import check_all
     check_all(config="a2_pyta.txt")
@@ -3,43 +3,68 @@ An implementation of a state for SubtractSquare.
 
 NOTE: You do not have to run python-ta on this file.
 """
+from itertools import count
+from math import isqrt
 from typing import Any
 from game_state import GameState
+from subtraction_state import SubtractionState
 
 
-class SubtractSquareState(GameState):
+def squares() -> Any:
+    """
+    Return an iterator over the positive perfect squares.
+
+    >>> iterator = squares()
+    >>> [next(iterator) for _ in range(4)]
+    [1, 4, 9, 16]
+    """
+    return (i * i for i in count(1))
+
+
+class SubtractSquareState(SubtractionState):
     """
     The state of a game at a certain point in time.
     """
+    __slots__ = ()
 
     def __init__(self, is_p1_turn: bool, current_total: int) -> None:
         """
         Initialize this game state and set the current player based on
         is_p1_turn.
         """
-        super().__init__(is_p1_turn)
-        self.current_total = current_total
+        super().__init__(is_p1_turn, current_total, squares)
 
-    def __str__(self) -> str:
+    def __reduce__(self) -> tuple:
         """
-        Return a string representation of the current state of the game.
+        Pickle this state as the arguments that make it.
+
+        >>> import pickle
+        >>> len(pickle.dumps(SubtractSquareState(True, 10 ** 6))) < 96
+        True
         """
-        return "Current total: {}".format(self.current_total)
+        return SubtractSquareState, (self.p1_turn, self.current_total)
 
     def get_possible_moves(self) -> list:
         """
         Return all possible moves that can be applied to this state.
+
+        >>> SubtractSquareState(True, 10).get_possible_moves()
+        [1, 4, 9]
         """
-        moves = []
-        for i in range(1, self.current_total + 1):
-            if i ** 2 <= self.current_total:
-                moves.append(i ** 2)
+        return [i * i for i in range(1, isqrt(self.current_total) + 1)]
 
-        return moves
+    def in_subtraction_set(self, number: int) -> bool:
+        """
+        Return whether number is a positive perfect square.
+        """
+        return is_pos_square(number)
 
     def make_move(self, move: Any) -> "SubtractSquareState":
         """
         Return the GameState that results from applying move to this GameState.
+
+        >>> SubtractSquareState(True, 10).make_move("4")
+        P1's Turn: False - Total: 6
         """
         if type(move) == str:
             move = int(move)
@@ -48,25 +73,160 @@ class SubtractSquareState(GameState):
                                         self.current_total - move)
         return new_state
 
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return whether self and other have the same total and player to move.
+
+        >>> SubtractSquareState(True, 10).make_move(9) == \
+        SubtractSquareState(False, 1)
+        True
+        """
+        if not isinstance(other, SubtractSquareState):
+            return NotImplemented
+        return (self.current_total == other.current_total
+                and self.p1_turn == other.p1_turn)
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of the total and player to move.
+        """
+        return self.key()
+
+    def key(self) -> int:
+        """
+        Return an int that packs the total and player to move, for use as a
+        cache key.
+        """
+        return self.current_total << 1 | self.p1_turn
+
+
+class MultiSubtractSquareState(GameState):
+    """
+    The state of a game of SubtractSquare played on several totals at once,
+    where each move subtracts a square from any one of them. A move is a
+    tuple of the index of a total and the square to subtract from it.
+
+    totals - the totals left to subtract from
+    """
+    __slots__ = ('totals', '_history')
+    supports_apply = True
+    totals: list
+
+    def __init__(self, is_p1_turn: bool, totals: Any) -> None:
+        """
+        Initialize this game state with totals and set the current player
+        based on is_p1_turn.
+        """
+        super().__init__(is_p1_turn)
+        self.totals = list(totals)
+        self._history = []
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickle this state as the arguments that make it. Anything
+        remembered for undo() is left behind.
+
+        >>> import pickle
+        >>> pickle.loads(pickle.dumps(MultiSubtractSquareState(True, [3, 5])))
+        P1's Turn: True - Totals: (3, 5)
+        """
+        return MultiSubtractSquareState, (self.p1_turn, tuple(self.totals))
+
+    def __str__(self) -> str:
+        """
+        Return a string representation of the current state of the game.
+
+        >>> print(MultiSubtractSquareState(True, [3, 5]))
+        Current totals: 3, 5
+        """
+        return "Current totals: {}".format(
+            ", ".join(str(total) for total in self.totals))
+
+    def get_possible_moves(self) -> list:
+        """
+        Return all possible moves that can be applied to this state.
+
+        >>> MultiSubtractSquareState(True, [1, 4]).get_possible_moves()
+        [(0, 1), (1, 1), (1, 4)]
+        """
+        return [(heap, i * i) for heap, total in enumerate(self.totals)
+                for i in range(1, isqrt(total) + 1)]
+
+    def make_move(self, move: Any) -> "MultiSubtractSquareState":
+        """
+        Return the GameState that results from applying move to this GameState.
+
+        >>> MultiSubtractSquareState(True, [3, 5]).make_move((1, 4))
+        P1's Turn: False - Totals: (3, 1)
+        """
+        heap, square = move
+        totals = list(self.totals)
+        totals[heap] -= square
+        return MultiSubtractSquareState(not self.p1_turn, totals)
+
+    def apply(self, move: Any) -> None:
+        """
+        Apply move to this GameState in place, remembering it so that undo()
+        can reverse it.
+        """
+        self._history.append(move)
+        self.totals[move[0]] -= move[1]
+        self.p1_turn = not self.p1_turn
+        self._legal_moves = None
+
+    def undo(self) -> None:
+        """
+        Reverse the most recent apply() on this GameState.
+        """
+        heap, square = self._history.pop()
+        self.totals[heap] += square
+        self.p1_turn = not self.p1_turn
+        self._legal_moves = None
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return whether self and other have the same totals and player to
+        move.
+        """
+        if not isinstance(other, MultiSubtractSquareState):
+            return NotImplemented
+        return (self.totals == other.totals
+                and self.p1_turn == other.p1_turn)
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of the totals and player to move.
+        """
+        return hash(self.key())
+
+    def key(self) -> tuple:
+        """
+        Return a tuple of the totals and player to move, for use as a cache
+        key.
+        """
+        return tuple(self.totals) + (self.p1_turn,)
+
     def __repr__(self) -> str:
         """
         Return a representation of this state (which can be used for
         equality testing).
         """
-        return "P1's Turn: {} - Total: {}".format(self.p1_turn,
-                                                  self.current_total)
+        return "P1's Turn: {} - Totals: {}".format(self.p1_turn,
+                                                   tuple(self.totals))
 
     def rough_outcome(self) -> float:
         """
         Return an estimate in interval [LOSE, WIN] of best outcome the current
         player can guarantee from state self.
+
+        >>> MultiSubtractSquareState(True, [0, 9]).rough_outcome()
+        1
         """
-        if is_pos_square(self.current_total):
-            return self.WIN
-        elif all([is_pos_square(self.current_total - n ** 2)
-                  for n in range(1, self.current_total + 1)
-                  if n ** 2 < self.current_total]):
+        left = [total for total in self.totals if total > 0]
+        if left == []:
             return self.LOSE
+        elif len(left) == 1 and is_pos_square(left[0]):
+            return self.WIN
         return self.DRAW
 
 
@@ -0,0 +1,189 @@
+"""
+An implementation of a state for subtraction games, where players take turns
+subtracting a number from a fixed set from a running total, and whoever
+reaches 0 wins.
+
+NOTE: You do not have to run python-ta on this file.
+"""
+from itertools import takewhile
+from typing import Any
+from game_state import GameState
+
+
+class SubtractionState(GameState):
+    """
+    The state of a subtraction game at a certain point in time.
+
+    current_total - the total left to subtract from
+    subtraction_set - the numbers that may be subtracted: a sorted tuple of
+                      positive ints, or a function that returns an iterator
+                      over an infinite increasing sequence of them
+    """
+    __slots__ = ('current_total', 'subtraction_set', '_history')
+    supports_apply = True
+    current_total: int
+    subtraction_set: Any
+
+    def __init__(self, is_p1_turn: bool, current_total: int,
+                 subtraction_set: Any) -> None:
+        """
+        Initialize this game state with current_total left and the numbers in
+        subtraction_set to subtract, and set the current player based on
+        is_p1_turn.
+
+        subtraction_set is either a finite collection of positive ints, or a
+        function that takes no arguments and returns an iterator over an
+        infinite increasing sequence of them.
+
+        >>> SubtractionState(True, 10, [3, 1, 3]).subtraction_set
+        (1, 3)
+        """
+        super().__init__(is_p1_turn)
+        self.current_total = current_total
+        if callable(subtraction_set):
+            self.subtraction_set = subtraction_set
+        else:
+            self.subtraction_set = tuple(sorted(set(subtraction_set)))
+        self._history = []
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickle this state as the arguments that make it. Anything
+        remembered for undo() is left behind.
+
+        >>> import pickle
+        >>> pickle.loads(pickle.dumps(SubtractionState(False, 7, (1, 3))))
+        P1's Turn: False - Total: 7
+        """
+        return SubtractionState, (self.p1_turn, self.current_total,
+                                  self.subtraction_set)
+
+    def __str__(self) -> str:
+        """
+        Return a string representation of the current state of the game.
+        """
+        return "Current total: {}".format(self.current_total)
+
+    def get_possible_moves(self) -> list:
+        """
+        Return all possible moves that can be applied to this state.
+
+        >>> SubtractionState(True, 4, (1, 3, 5)).get_possible_moves()
+        [1, 3]
+        """
+        if callable(self.subtraction_set):
+            numbers = self.subtraction_set()
+        else:
+            numbers = self.subtraction_set
+        return list(takewhile(lambda n: n <= self.current_total, numbers))
+
+    def in_subtraction_set(self, number: int) -> bool:
+        """
+        Return whether number may be subtracted in this game.
+
+        >>> SubtractionState(True, 4, (1, 3, 5)).in_subtraction_set(3)
+        True
+        """
+        if callable(self.subtraction_set):
+            for n in self.subtraction_set():
+                if n >= number:
+                    return n == number
+            return False
+        return number in self.subtraction_set
+
+    def make_move(self, move: Any) -> "SubtractionState":
+        """
+        Return the GameState that results from applying move to this GameState.
+        """
+        if type(move) == str:
+            move = int(move)
+        return SubtractionState(not self.p1_turn, self.current_total - move,
+                                self.subtraction_set)
+
+    def apply(self, move: Any) -> None:
+        """
+        Apply move to this GameState in place, remembering it so that undo()
+        can reverse it.
+
+        >>> state = SubtractionState(True, 10, (1, 2))
+        >>> state.apply(2)
+        >>> state
+        P1's Turn: False - Total: 8
+        """
+        if type(move) == str:
+            move = int(move)
+        self._history.append(move)
+        self.current_total -= move
+        self.p1_turn = not self.p1_turn
+        self._legal_moves = None
+
+    def undo(self) -> None:
+        """
+        Reverse the most recent apply() on this GameState.
+
+        >>> state = SubtractionState(True, 10, (1, 2))
+        >>> state.apply(2)
+        >>> state.undo()
+        >>> state
+        P1's Turn: True - Total: 10
+        """
+        self.current_total += self._history.pop()
+        self.p1_turn = not self.p1_turn
+        self._legal_moves = None
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return whether self and other have the same total, player to move and
+        subtraction set.
+
+        >>> SubtractionState(True, 10, (1, 2)).make_move(2) == \
+        SubtractionState(False, 8, (2, 1))
+        True
+        """
+        if not isinstance(other, SubtractionState):
+            return NotImplemented
+        return (self.current_total == other.current_total
+                and self.p1_turn == other.p1_turn
+                and self.subtraction_set == other.subtraction_set)
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of the total, player to move and subtraction set.
+        """
+        return hash(self.key())
+
+    def key(self) -> Any:
+        """
+        Return the subtraction set with an int that packs the total and
+        player to move, for use as a cache key.
+        """
+        return self.subtraction_set, self.current_total << 1 | self.p1_turn
+
+    def __repr__(self) -> str:
+        """
+        Return a representation of this state (which can be used for
+        equality testing).
+        """
+        return "P1's Turn: {} - Total: {}".format(self.p1_turn,
+                                                  self.current_total)
+
+    def rough_outcome(self) -> float:
+        """
+        Return an estimate in interval [LOSE, WIN] of best outcome the current
+        player can guarantee from state self.
+
+        >>> SubtractionState(True, 4, (1, 3)).rough_outcome()
+        -1
+        """
+        moves = self.get_possible_moves()
+        if self.current_total in moves:
+            return self.WIN
+        elif all([self.in_subtraction_set(self.current_total - n)
+                  for n in moves if n < self.current_total]):
+            return self.LOSE
+        return self.DRAW
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,276 @@
+"""
+Endgame tablebases for small Stonehedge boards: every position's exact
+outcome and best move, worked out once, saved to a file, and read back
+without searching.
+"""
+from itertools import combinations
+import mmap
+import os
+import struct
+from typing import Any
+from stonehedge import StonehedgeState, LETTERS, get_topology
+from strategy import minimax_alphabeta
+
+# The largest board whose positions can all be stored; a size 4 board would
+# take 3 ** 18 * 16 bytes.
+MAX_SIZE = 3
+
+# The file starts with a magic string, the board size and the number of
+# claimed cells of the next layer to generate, which is -1 once every layer
+# is done.
+HEADER = struct.Struct("<4sBbxx")
+MAGIC = b"SHTB"
+
+# Each position is one byte: its outcome in the low two bits and the index
+# of its best cell in the rest. NO_MOVE marks a finished game.
+UNKNOWN = 0
+LOST = 1
+WON = 2
+NO_MOVE = 63
+
+
+def table_path(directory: str, board_size: int) -> str:
+    """
+    Return the path of the tablebase for boards of board_size in directory.
+
+    >>> table_path("tables", 2)
+    'tables/stonehedge_2.tb'
+    """
+    return os.path.join(directory, "stonehedge_{}.tb".format(board_size))
+
+
+def _index(board_size: int, mover_cells: int, opponent_cells: int,
+           captured: int) -> int:
+    """
+    Return where the position with the player to move on mover_cells and
+    their opponent on opponent_cells, with the player to move holding
+    captured leylines, is stored in a tablebase for board_size.
+
+    The outcome of a position depends only on who holds which cells and on
+    how many leylines the player to move holds: the leylines still open
+    follow from the cells, and which of the decided ones each player holds
+    no longer matters. The index is the cells read as a base 3 number
+    (0 for empty, 1 for the player to move, 2 for their opponent), times the
+    number of possible leyline counts, plus captured.
+
+    >>> _index(1, 0b001, 0b100, 2)
+    135
+    """
+    rank = 0
+    power = 1
+    for cell in range(get_topology(board_size).num_cells):
+        if mover_cells >> cell & 1:
+            rank += power
+        elif opponent_cells >> cell & 1:
+            rank += 2 * power
+        power *= 3
+    return rank * (get_topology(board_size).num_leylines + 1) + captured
+
+
+def generate(board_size: int, path: str, layers: int = None) -> bool:
+    """
+    Work out the tablebase for boards of board_size and save it to path,
+    returning whether it is complete.
+
+    Positions are worked out in layers by the number of claimed cells, from
+    full boards down to the empty one, so that every move leads into a layer
+    that is already done. The file records each finished layer, so if path
+    already holds part of a tablebase, generation carries on from where it
+    stopped. If layers is given, stop after that many more layers.
+
+    Precondition: 1 <= board_size <= MAX_SIZE
+    """
+    topology = get_topology(board_size)
+    num_cells = topology.num_cells
+    stride = topology.num_leylines + 1
+    size = HEADER.size + 3 ** num_cells * stride
+    if not os.path.exists(path):
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, board_size, num_cells))
+            file.truncate(size)
+    with open(path, "r+b") as file:
+        data = mmap.mmap(file.fileno(), size)
+        try:
+            magic, file_size, layer = HEADER.unpack_from(data)
+            if magic != MAGIC or file_size != board_size:
+                raise ValueError("{} is not a tablebase for size {}".format(
+                    path, board_size))
+            while layer >= 0 and layers != 0:
+                _generate_layer(topology, data, layer)
+                data.flush()
+                layer -= 1
+                HEADER.pack_into(data, 0, MAGIC, board_size, layer)
+                data.flush()
+                if layers is not None:
+                    layers -= 1
+        finally:
+            data.close()
+    return layer < 0
+
+
+def _generate_layer(topology: Any, data: mmap.mmap, claimed: int) -> None:
+    """
+    Work out every position in data with claimed cells claimed, assuming
+    every position with more cells claimed is already done.
+    """
+    num_cells = topology.num_cells
+    stride = topology.num_leylines + 1
+    to_win = topology.to_win
+    masks = tuple(zip(topology.leyline_masks, topology.thresholds))
+    powers = [3 ** cell for cell in range(num_cells)]
+    # The player to move has made as many moves as their opponent, or one
+    # fewer.
+    num_opponent = (claimed + 1) // 2
+    for opponent in combinations(range(num_cells), num_opponent):
+        opponent_cells = sum(1 << cell for cell in opponent)
+        opponent_rank = sum(powers[cell] for cell in opponent)
+        rest = [cell for cell in range(num_cells) if cell not in opponent]
+        for mover in combinations(rest, claimed - num_opponent):
+            mover_cells = sum(1 << cell for cell in mover)
+            mover_rank = sum(powers[cell] for cell in mover)
+            open_lines = []
+            decided = 0
+            for mask, threshold in masks:
+                if ((mover_cells & mask).bit_count() >= threshold
+                        or (opponent_cells & mask).bit_count() >= threshold):
+                    decided += 1
+                else:
+                    open_lines.append((mask, threshold))
+            empty = [cell for cell in rest if cell not in mover]
+            # The number of open leylines each empty cell would capture
+            # for the player to move.
+            captures = [sum(1 for mask, threshold in open_lines
+                            if mask >> cell & 1
+                            and (mover_cells & mask).bit_count() + 1
+                            >= threshold)
+                        for cell in empty]
+            base = HEADER.size + (mover_rank + 2 * opponent_rank) * stride
+            for captured in range(decided + 1):
+                if (captured >= to_win or decided - captured >= to_win
+                        or empty == []):
+                    data[base + captured] = LOST | NO_MOVE << 2
+                    continue
+                record = LOST | empty[0] << 2
+                for cell, gained in zip(empty, captures):
+                    # After the move, the opponent is to move on the cells
+                    # that were theirs, holding the leylines that were theirs.
+                    child_rank = opponent_rank + 2 * (mover_rank
+                                                      + powers[cell])
+                    child = (HEADER.size + child_rank * stride
+                             + decided - captured)
+                    if (captured + gained >= to_win
+                            or data[child] & 3 == LOST):
+                        record = WON | cell << 2
+                        break
+                data[base + captured] = record
+
+
+class Tablebase:
+    """
+    A read-only view of a tablebase file. The file is memory-mapped, so a
+    lookup reads only the byte it needs from disk.
+
+    board_size - the side length of the boards this tablebase covers
+    """
+    board_size: int
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the complete tablebase saved at path.
+        """
+        with open(path, "rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.board_size, layer = HEADER.unpack_from(self._data)
+        if magic != MAGIC or layer >= 0:
+            self._data.close()
+            raise ValueError("{} is not a complete tablebase".format(path))
+
+    def lookup(self, state: StonehedgeState) -> Any:
+        """
+        Return (outcome, move) for state: its outcome for the player to
+        move, and the best move, or None if the game is over. Return None if
+        state is not in this tablebase.
+        """
+        if state.size != self.board_size:
+            return None
+        if state.p1_turn:
+            mover, opponent = state._p1_cells, state._p2_cells
+            captured = state._p1_captured
+        else:
+            mover, opponent = state._p2_cells, state._p1_cells
+            captured = state._p2_captured
+        if opponent.bit_count() - mover.bit_count() not in (0, 1):
+            return None
+        record = self._data[HEADER.size + _index(self.board_size, mover,
+                                                 opponent, captured)]
+        if record & 3 == UNKNOWN:
+            return None
+        move = record >> 2
+        return (state.WIN if record & 3 == WON else state.LOSE,
+                None if move == NO_MOVE else LETTERS[move])
+
+    def close(self) -> None:
+        """
+        Close the file behind this tablebase.
+        """
+        self._data.close()
+
+
+class TablebaseStrategy:
+    """
+    A strategy that plays Stonehedge boards of size up to MAX_SIZE straight
+    from their tablebases, and falls back on minimax_alphabeta for any
+    other game.
+
+    The tablebase for a size is opened from directory the first time it is
+    needed, and generated there first if it is missing or unfinished.
+
+    directory - where the tablebase files are kept
+    tables - the tablebases opened so far, by board size
+    """
+    directory: str
+    tables: dict
+
+    def __init__(self, directory: str = ".") -> None:
+        """
+        Initialize this strategy to keep its tablebases in directory.
+        """
+        self.directory = directory
+        self.tables = {}
+
+    def __call__(self, game: Any) -> Any:
+        """
+        Return the tablebase's best move for game, or minimax_alphabeta's if
+        its state is not covered by a tablebase.
+        """
+        state = game.current_state
+        if isinstance(state, StonehedgeState) and state.size <= MAX_SIZE:
+            result = self.table(state.size).lookup(state)
+            if result is not None and result[1] is not None:
+                return result[1]
+        return minimax_alphabeta(game)
+
+    def table(self, board_size: int) -> Tablebase:
+        """
+        Return the tablebase for boards of board_size, generating it first
+        if need be.
+        """
+        if board_size not in self.tables:
+            path = table_path(self.directory, board_size)
+            generate(board_size, path)
+            self.tables[board_size] = Tablebase(path)
+        return self.tables[board_size]
+
+    def close(self) -> None:
+        """
+        Close every tablebase this strategy has opened.
+        """
+        for table in self.tables.values():
+            table.close()
+        self.tables = {}
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")
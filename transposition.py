@@ -0,0 +1,110 @@
+"""
+A transposition table: a bounded cache of search results keyed by position.
+"""
+from collections import OrderedDict
+from typing import Any
+
+
+class TranspositionTable:
+    """
+    A cache of search results for game positions, keyed by GameState.key().
+    It holds at most max_entries entries and evicts the least recently used
+    entry to make room for a new one.
+
+    max_entries - the most entries this table holds at once
+    hits - the number of lookups that found an entry
+    misses - the number of lookups that did not
+    evictions - the number of entries dropped to make room for others
+    """
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, max_entries: int = 1000000) -> None:
+        """
+        Initialize an empty table that holds at most max_entries entries.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries in this table.
+        """
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        """
+        Return a summary of this table's size and statistics.
+
+        >>> table = TranspositionTable(10)
+        >>> table.store('a', 1)
+        >>> table.get('a'), table.get('b')
+        (1, None)
+        >>> print(table)
+        1/10 entries - 1 hits, 1 misses (50.0% hit rate), 0 evictions
+        """
+        return "{}/{} entries - {} hits, {} misses ({:.1%} hit rate), " \
+               "{} evictions".format(len(self), self.max_entries, self.hits,
+                                     self.misses, self.hit_rate(),
+                                     self.evictions)
+
+    def get(self, key: Any) -> Any:
+        """
+        Return the entry stored under key, or None if there is none, and mark
+        it as the most recently used.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: Any, entry: Any) -> None:
+        """
+        Store entry under key, evicting the least recently used entry if
+        the table is full.
+
+        >>> table = TranspositionTable(2)
+        >>> table.store('a', 1)
+        >>> table.store('b', 2)
+        >>> table.get('a')
+        1
+        >>> table.store('c', 3)
+        >>> table.get('b') is None, table.evictions
+        (True, 1)
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        elif len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._entries[key] = entry
+
+    def hit_rate(self) -> float:
+        """
+        Return the fraction of lookups that found an entry.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """
+        Remove every entry and reset the statistics.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+
+    check_all(config="a2_pyta.txt")